@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple, Union
+
+from bulk import parse_many, sort_versions
+from hw1 import Version, _scan_version, bump_many, iter_packed, pack_versions, sort_key
+from release_store import ReleaseStore
+from resolver_service import Registry, ResolverClient, ResolverService
+from version_array import VersionArray
+from version_index import VersionIndex
+from version_range import VersionRange
+
+
+PRERELEASE_LABELS = ['alpha', 'beta', 'rc', 'dev', 'preview']
+
+
+def make_corpus(n: int, seed: int = 0, prerelease_ratio: float = 0.1) -> List[str]:
+    """Generate n realistic version strings (mostly releases, some prereleases/builds)."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        version = f"{rng.randint(0, 20)}.{rng.randint(0, 50)}.{rng.randint(0, 100)}"
+        if rng.random() < prerelease_ratio:
+            version += f"-{rng.choice(PRERELEASE_LABELS)}"
+            if rng.random() < 0.7:
+                version += f".{rng.randint(0, 12)}"
+        if rng.random() < 0.05:
+            version += f"+build.{rng.randint(1, 9999)}"
+        if rng.random() < 0.05:
+            version = 'v' + version
+        corpus.append(version)
+    return corpus
+
+
+class _LegacyVersion(Version):
+    """Version compared the way it was before the precomputed sort key."""
+    __slots__ = ()
+
+    def __lt__(self, other):
+        self_core = (self.major, self.minor, self.patch)
+        other_core = (other.major, other.minor, other.patch)
+        if self_core != other_core:
+            return self_core < other_core
+        return self._compare_prerelease(other.prerelease) < 0
+
+    def _compare_prerelease(self, other_prerelease: Tuple[Union[int, str], ...]) -> int:
+        if not self.prerelease and not other_prerelease:
+            return 0
+        if not self.prerelease:
+            return 1
+        if not other_prerelease:
+            return -1
+        for left, right in zip(self.prerelease, other_prerelease):
+            if isinstance(left, int) and isinstance(right, int):
+                if left != right:
+                    return -1 if left < right else 1
+            elif isinstance(left, int) and isinstance(right, str):
+                return -1
+            elif isinstance(left, str) and isinstance(right, int):
+                return 1
+            elif left != right:
+                return -1 if left < right else 1
+        if len(self.prerelease) != len(other_prerelease):
+            return -1 if len(self.prerelease) < len(other_prerelease) else 1
+        return 0
+
+
+class _EagerVersion(Version):
+    """Version that decodes its prerelease at parse time, as before lazy decoding."""
+    __slots__ = ()
+
+    @classmethod
+    def _from_string(cls, version: str, strict: bool = False) -> Version:
+        self = super()._from_string(version, strict)
+        self._decode_pre_key()
+        return self
+
+
+def _legacy_parse(version: str):
+    """The regex/split based parser Version used before the scanner."""
+    version = version.lstrip('v')
+    if '+' in version:
+        version, build_metadata = version.split('+', 1)
+    else:
+        build_metadata = None
+    if '-' in version:
+        main_version, prerelease = version.split('-', 1)
+    else:
+        main_version, prerelease = version, None
+    main_parts = main_version.split('.')
+    major = int(main_parts[0])
+    minor = int(main_parts[1]) if len(main_parts) > 1 else 0
+    patch = 0
+    if len(main_parts) >= 3:
+        match = re.match(r'(\d+)(.*)$', main_parts[2])
+        if match:
+            patch = int(match.group(1))
+            suffix = match.group(2)
+            if suffix:
+                prerelease = suffix if not prerelease else f"{suffix}.{prerelease}"
+    prerelease = Version._parse_prerelease(prerelease) if prerelease else ()
+    return major, minor, patch, prerelease, build_metadata
+
+
+def _scanner_parse(version: str, strict: bool = False):
+    """Version's scanner with the prerelease decoded, as a tuple like _legacy_parse() returns."""
+    major, minor, patch, prerelease, build_metadata = _scan_version(version, strict)
+    prerelease = Version._parse_prerelease(prerelease) if prerelease else ()
+    return major, minor, patch, prerelease, build_metadata
+
+
+def timed(label: str, count: int, func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.3f}s  {count / elapsed:14,.0f} items/s")
+    return elapsed
+
+
+def bench_sort(args) -> None:
+    corpus = make_corpus(args.n, args.seed)
+    legacy = [_LegacyVersion(v) for v in corpus]
+    current = [Version(v) for v in corpus]
+    print(f"sorted() over {args.n:,} versions")
+    before = timed('before: tuple + _compare_prerelease', args.n, lambda: sorted(legacy))
+    after = timed('after: precomputed sort key', args.n, lambda: sorted(current))
+    print(f"speedup: {before / after:.2f}x")
+
+
+def bench_intern(args) -> None:
+    distinct = make_corpus(args.distinct, args.seed)
+    rng = random.Random(args.seed)
+    corpus = [rng.choice(distinct) for _ in range(args.n)]
+    print(f"Version() over {args.n:,} strings drawn from {args.distinct:,} distinct values")
+    Version.set_cache_size(0)
+    uncached = timed('intern cache disabled', args.n, lambda: [Version(v) for v in corpus])
+    Version.set_cache_size(max(args.distinct, 1))
+    cached = timed('intern cache enabled', args.n, lambda: [Version(v) for v in corpus])
+    print(f"speedup: {uncached / cached:.2f}x  {Version.cache_info()}")
+
+
+def bench_parse(args) -> None:
+    corpus = make_corpus(args.n, args.seed)
+    parse = _scanner_parse
+    print(f"parsing {args.n:,} version strings")
+    before = timed('before: split + re.match', args.n, lambda: [_legacy_parse(v) for v in corpus])
+    after = timed('after: partition scanner (lenient)', args.n, lambda: [parse(v) for v in corpus])
+    strict_corpus = [v.lstrip('v') for v in corpus]
+    timed('after: partition scanner (strict)', args.n, lambda: [parse(v, True) for v in strict_corpus])
+    print(f"speedup (lenient): {before / after:.2f}x")
+
+
+def peak_memory(func: Callable[[], object]) -> Tuple[int, object]:
+    tracemalloc.start()
+    try:
+        result = func()
+        return tracemalloc.get_traced_memory()[1], result
+    finally:
+        tracemalloc.stop()
+
+
+def bench_array(args) -> None:
+    corpus = make_corpus(args.n, args.seed)
+    print(f"parse + sort + dedupe of {args.n:,} versions")
+    Version.set_cache_size(0)
+    objects = timed('list of Version, sorted(set(...))', args.n,
+                    lambda: sorted(set(Version(v) for v in corpus)))
+    columnar = timed('VersionArray(...).unique()', args.n, lambda: VersionArray(corpus).unique())
+    print(f"speedup: {objects / columnar:.2f}x")
+    object_peak, _ = peak_memory(lambda: [Version(v) for v in corpus])
+    array_peak, versions = peak_memory(lambda: VersionArray(corpus))
+    print(f"peak memory: list of Version {object_peak / 2**20:,.1f} MiB, "
+          f"VersionArray {array_peak / 2**20:,.1f} MiB (resident {versions.nbytes / 2**20:,.1f} MiB)")
+
+
+def bench_range(args) -> None:
+    corpus = sorted(Version(v) for v in make_corpus(args.n, args.seed))
+    expressions = ['^1.4', '~3.2.1', '>=2.0.0-rc <4', '1.x || 7.x', '4.3 - 8']
+    ranges = [VersionRange(expression) for expression in expressions]
+    count = args.n * len(ranges)
+    print(f"filtering {args.n:,} sorted versions through {len(ranges)} ranges")
+    scan = timed('linear scan with contains()', count,
+                 lambda: [[v for v in corpus if v in version_range] for version_range in ranges])
+    bisect = timed('bisect with filter_sorted()', count,
+                   lambda: [version_range.filter_sorted(corpus) for version_range in ranges])
+    print(f"speedup: {scan / bisect:.2f}x")
+
+
+def bench_index(args) -> None:
+    candidates = [Version(v) for v in make_corpus(args.n, args.seed)]
+    index = VersionIndex(candidates)
+    rng = random.Random(args.seed)
+    queries = [VersionRange(f"^{rng.randint(0, 20)}.{rng.randint(0, 50)}") for _ in range(args.queries)]
+    print(f"max_satisfying over {len(index):,} candidates, {args.queries} queries")
+    naive = timed('max(filter(range.contains, candidates))', args.queries,
+                  lambda: [max(filter(query.contains, candidates), default=None) for query in queries])
+    indexed = timed('VersionIndex.max_satisfying', args.queries,
+                    lambda: [index.max_satisfying(query) for query in queries])
+    print(f"speedup: {naive / indexed:,.0f}x")
+
+
+def bench_bulk(args) -> None:
+    corpus = make_corpus(args.n, args.seed)
+    print(f"parse_many/sort_versions over {args.n:,} strings ({os.cpu_count()} CPUs available)")
+    results = []
+    for workers in args.workers:
+        parse = timed(f'parse_many workers={workers}', args.n, lambda: parse_many(corpus, workers=workers))
+        sort = timed(f'sort_versions workers={workers}', args.n, lambda: sort_versions(corpus, workers=workers))
+        results.append((workers, parse, sort))
+    first_parse, first_sort = results[0][1:]
+    for workers, parse, sort in results:
+        print(f"workers={workers}: parse scaling {first_parse / parse:.2f}x, sort scaling {first_sort / sort:.2f}x")
+
+
+def bench_codec(args) -> None:
+    corpus = make_corpus(args.n, args.seed)
+    Version.set_cache_size(0)
+    versions = [Version(v) for v in corpus]
+    print(f"binary encoding of {args.n:,} versions")
+    timed('Version(str) re-parse', args.n, lambda: [Version(v) for v in corpus])
+    timed('pack_versions()', args.n, lambda: pack_versions(versions, include_build=True))
+    packed = pack_versions(versions, include_build=True)
+    timed('Version.from_bytes() over iter_packed()', args.n,
+          lambda: [Version.from_bytes(record) for record in iter_packed(packed)])
+    text_size = sum(len(v) + 1 for v in corpus)
+    print(f"size: text {text_size / 2**20:,.1f} MiB, packed {len(packed) / 2**20:,.1f} MiB")
+
+
+def bench_lazy(args) -> None:
+    corpus = make_corpus(args.n, args.seed, prerelease_ratio=args.prerelease_ratio)
+    Version.set_cache_size(0)
+    print(f"{args.n:,} versions, {args.prerelease_ratio:.0%} prereleases, best of {args.repeat}")
+    for label, cls in (('eager', _EagerVersion), ('lazy', Version)):
+        parse = best_of(args.repeat, lambda: [cls(v) for v in corpus])
+        versions = [cls(v) for v in corpus]
+        sort = best_of(args.repeat, lambda: sorted(versions))
+        peak, _ = peak_memory(lambda: [cls(v) for v in corpus])
+        print(f"{label + ' prerelease decoding':<30} parse {parse:7.3f}s  sort {sort:7.3f}s  "
+              f"peak {peak / 2**20:7.1f} MiB")
+
+
+def bench_bump(args) -> None:
+    versions = [Version(v) for v in make_corpus(args.n, args.seed)]
+    Version.set_cache_size(0)
+    print(f"patch bump of {args.n:,} versions")
+    reparse = timed('format + Version() re-parse', args.n,
+                    lambda: [Version(f"{v.major}.{v.minor}.{v.patch + 1}") for v in versions])
+    bumped = timed('bump_many(versions, "patch")', args.n, lambda: bump_many(versions, 'patch'))
+    print(f"speedup: {reparse / bumped:.2f}x")
+
+
+def percentiles(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"p50 {statistics.median(ordered) * 1000:8.3f} ms  p99 {p99 * 1000:8.3f} ms"
+
+
+def bench_store(args) -> None:
+    corpus = make_corpus(args.n, args.seed)
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory, ReleaseStore(os.path.join(directory, 'releases.db')) as store:
+        rows = ((f"pkg{index % args.packages}", version, 1_700_000_000 + index, f"https://example.invalid/{index}")
+                for index, version in enumerate(corpus))
+        timed(f'upsert_many into {args.packages} packages', args.n, lambda: store.upsert_many(rows))
+        print(f"{store.count():,} distinct releases stored")
+
+        major = 0
+        queries = {
+            'scan(^M.m)': lambda package: list(store.scan(package, f"^{rng.randint(0, 20)}.{rng.randint(0, 50)}")),
+            'between(M.m.0, M+1.0.0-rc.1)': lambda package: list(store.between(
+                package, f"{major}.{rng.randint(0, 50)}.0", f"{major + 1}.0.0-rc.1")),
+            'prefix(M.m.*)': lambda package: list(store.prefix(
+                package, f"{rng.randint(0, 20)}.{rng.randint(0, 50)}.*")),
+            'latest()': lambda package: store.latest(package),
+        }
+        for name, query in queries.items():
+            samples = []
+            for _ in range(args.queries):
+                package = f"pkg{rng.randrange(args.packages)}"
+                major = rng.randint(0, 20)
+                start = time.perf_counter()
+                query(package)
+                samples.append(time.perf_counter() - start)
+            print(f"{name:<40} {percentiles(samples)}")
+
+
+def bench_serve(args) -> None:
+    corpus = make_corpus(args.n, args.seed)
+    registry = Registry({f"pkg{index}": VersionIndex(corpus[index::args.packages]) for index in range(args.packages)})
+    rng = random.Random(args.seed)
+    requests = [[(f"pkg{rng.randrange(args.packages)}", f"^{rng.randint(0, 20)}.{rng.randint(0, 50)}")
+                 for _ in range(args.queries)] for _ in range(args.clients * args.requests)]
+    print(f"{args.clients} clients x {args.requests} requests x {args.queries} queries "
+          f"over {args.packages} packages ({registry.version_count():,} versions)")
+
+    async def run(max_batch: int):
+        service = ResolverService(registry, max_batch=max_batch)
+        host, port = await service.start('127.0.0.1', 0)
+
+        async def client(offset: int) -> None:
+            async with ResolverClient(host, port) as connection:
+                for queries in requests[offset::args.clients]:
+                    await connection.resolve(queries)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client(offset) for offset in range(args.clients)))
+        elapsed = time.perf_counter() - start
+        stats = service.stats.snapshot()
+        await service.stop()
+        return elapsed, stats
+
+    for label, max_batch in (('unbatched (max_batch=1)', 1), (f'batched (max_batch={args.max_batch})', args.max_batch)):
+        elapsed, stats = asyncio.run(run(max_batch))
+        latency = stats['latency_ms']
+        print(f"{label:<30} {len(requests) / elapsed:10,.0f} requests/s  "
+              f"queries/batch {stats['mean_batch_size']:6.1f}  "
+              f"p50 {latency['p50']:7.3f} ms  p99 {latency['p99']:7.3f} ms")
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_suite(args) -> None:
+    corpus = make_corpus(args.n, args.seed)
+    rng = random.Random(args.seed)
+    Version.set_cache_size(0)
+    versions = [Version(v) for v in corpus]
+    pairs = [(rng.choice(versions), rng.choice(versions)) for _ in range(args.n)]
+    cases: Dict[str, Callable[[], object]] = {
+        'parse': lambda: [Version(v) for v in corpus],
+        'compare': lambda: [a < b for a, b in pairs],
+        'sort': lambda: sorted(versions),
+        'hash': lambda: set(versions),
+        'sort_key': lambda: [sort_key(v) for v in corpus],
+        'to_bytes': lambda: [v.to_bytes() for v in versions],
+    }
+    results = {}
+    print(f"hot paths over {args.n:,} versions, best of {args.repeat}")
+    for name, func in cases.items():
+        elapsed = best_of(args.repeat, func)
+        results[name] = args.n / elapsed
+        print(f"{name:<40} {elapsed:8.3f}s  {results[name]:14,.0f} items/s")
+    peak, _ = peak_memory(lambda: [Version(v) for v in corpus])
+    results['parse_peak_bytes_per_version'] = peak / args.n
+    print(f"{'parse peak memory':<40} {peak / 2**20:8.1f} MiB  {peak / args.n:14,.0f} bytes/version")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = []
+        for name, value in results.items():
+            if name not in baseline:
+                continue
+            # Throughputs must not drop and memory must not grow beyond the tolerance.
+            if name.endswith('_bytes_per_version'):
+                ratio = baseline[name] / value
+            else:
+                ratio = value / baseline[name]
+            status = 'REGRESSION' if ratio < 1 - args.tolerance else 'ok'
+            print(f"{name:<40} {ratio:8.2f}x of baseline  {status}")
+            if status != 'ok':
+                regressions.append(name)
+        if regressions:
+            print(f"Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmarks for the Version class')
+    parser.add_argument('--n', type=int, default=1_000_000, help='Corpus size (default: 1000000)')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus random seed (default: 0)')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    subparsers.add_parser('sort', help='sorted() throughput before/after the sort key').set_defaults(func=bench_sort)
+    subparsers.add_parser('parse', help='Parse throughput of the old and new parsers').set_defaults(func=bench_parse)
+    subparsers.add_parser('array', help='Version objects versus VersionArray columns').set_defaults(func=bench_array)
+    subparsers.add_parser('range', help='Range filtering by scan versus bisect').set_defaults(func=bench_range)
+    index = subparsers.add_parser('index', help='max_satisfying via VersionIndex versus a linear scan')
+    index.add_argument('--queries', type=int, default=20, help='Number of constraints to resolve (default: 20)')
+    index.set_defaults(func=bench_index)
+    bulk = subparsers.add_parser('bulk', help='Process-pool parse_many/sort_versions scaling')
+    bulk.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='Worker counts (default: 1 2 4 8)')
+    bulk.set_defaults(func=bench_bulk)
+    subparsers.add_parser('codec', help='to_bytes/from_bytes versus string parsing').set_defaults(func=bench_codec)
+    lazy = subparsers.add_parser('lazy', help='Eager versus lazy prerelease decoding')
+    lazy.add_argument('--prerelease-ratio', type=float, default=0.04, help='Share of prereleases (default: 0.04)')
+    lazy.add_argument('--repeat', type=int, default=3, help='Runs per case, best is kept (default: 3)')
+    lazy.set_defaults(func=bench_lazy)
+    subparsers.add_parser('bump', help='bump_many versus formatting and re-parsing').set_defaults(func=bench_bump)
+    store = subparsers.add_parser('store', help='ReleaseStore bulk upsert and query latency')
+    store.add_argument('--packages', type=int, default=100, help='Packages to spread rows over (default: 100)')
+    store.add_argument('--queries', type=int, default=200, help='Queries per kind (default: 200)')
+    store.set_defaults(func=bench_store)
+    serve = subparsers.add_parser('serve', help='Resolver service throughput and latency, batched and unbatched')
+    serve.add_argument('--packages', type=int, default=1000, help='Packages in the registry (default: 1000)')
+    serve.add_argument('--clients', type=int, default=64, help='Concurrent keep-alive clients (default: 64)')
+    serve.add_argument('--requests', type=int, default=50, help='Requests per client (default: 50)')
+    serve.add_argument('--queries', type=int, default=10, help='Constraints per request (default: 10)')
+    serve.add_argument('--max-batch', type=int, default=256, help='Batch size of the batched run (default: 256)')
+    serve.set_defaults(func=bench_serve)
+    suite = subparsers.add_parser('suite', help='Parse/compare/sort/hash throughput and peak memory')
+    suite.add_argument('--repeat', type=int, default=3, help='Runs per case, best is kept (default: 3)')
+    suite.add_argument('--json', help='Write results to this JSON file')
+    suite.add_argument('--baseline', help='Compare against a JSON file from an earlier --json run')
+    suite.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown vs baseline (default: 0.2)')
+    suite.set_defaults(func=bench_suite)
+    intern = subparsers.add_parser('intern', help='Version() construction with and without the intern cache')
+    intern.add_argument('--distinct', type=int, default=5000, help='Distinct strings in the corpus (default: 5000)')
+    intern.set_defaults(func=bench_intern)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from operator import itemgetter
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from hw1 import sort_key
+
+
+CHUNKS_PER_WORKER = 4
+
+
+def _chunk_keys(task: Tuple[Sequence[str], int, bool]) -> List[Tuple]:
+    chunk, _, strict = task
+    return [sort_key(text, strict) for text in chunk]
+
+
+def _chunk_sorted(task: Tuple[Sequence[str], int, bool]) -> List[Tuple[Tuple, int]]:
+    chunk, offset, strict = task
+    keyed = [(sort_key(text, strict), index) for index, text in enumerate(chunk, offset)]
+    keyed.sort(key=itemgetter(0))
+    return keyed
+
+
+def _run(func: Callable, strings: Sequence[str], workers: Optional[int],
+         strict: bool, chunk_size: Optional[int]) -> List:
+    workers = workers or os.cpu_count() or 1
+    if not chunk_size:
+        chunk_size = max(1, -(-len(strings) // (workers * CHUNKS_PER_WORKER)))
+    tasks = [(strings[start:start + chunk_size], start, strict)
+             for start in range(0, len(strings), chunk_size)]
+    if workers == 1 or len(tasks) <= 1:
+        return [func(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, tasks))
+
+
+def parse_many(strings: Iterable[str], workers: Optional[int] = None, strict: bool = False,
+               chunk_size: Optional[int] = None) -> List[Tuple]:
+    """Precedence keys (see hw1.sort_key) of strings, in input order.
+
+    The input is split into chunks parsed by a pool of worker processes; only
+    the key tuples travel back, never Version objects. workers defaults to
+    the CPU count and workers=1 parses in this process.
+    """
+    strings = strings if isinstance(strings, list) else list(strings)
+    return list(chain.from_iterable(_run(_chunk_keys, strings, workers, strict, chunk_size)))
+
+
+def sort_versions(strings: Iterable[str], workers: Optional[int] = None, strict: bool = False,
+                  reverse: bool = False, chunk_size: Optional[int] = None) -> List[str]:
+    """strings sorted by SemVer precedence, equal versions kept in input order.
+
+    Each worker sorts its chunk and returns (key, input index) pairs, so the
+    strings themselves are sent only one way. The chunks come back as sorted
+    runs, which the final list.sort() detects and merges in C.
+    """
+    strings = strings if isinstance(strings, list) else list(strings)
+    runs = _run(_chunk_sorted, strings, workers, strict, chunk_size)
+    merged = list(chain.from_iterable(runs))
+    merged.sort(key=itemgetter(0), reverse=reverse)
+    return [strings[index] for _, index in merged]
@@ -1,50 +1,355 @@
-import re
-from typing import List, Union
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+
+DEFAULT_CACHE_SIZE = 8192
+
+
+def _prerelease_key(prerelease: Tuple[Union[int, str], ...]) -> Tuple:
+    # Release versions sort above every prerelease of the same core, numeric
+    # identifiers sort below alphanumeric ones and a shorter identifier list
+    # sorts first when it is a prefix of the longer one (SemVer 2.0.0, item 11).
+    if not prerelease:
+        return (1,)
+    return (0, tuple((0, part) if isinstance(part, int) else (1, part) for part in prerelease))
+
+
+_RELEASE_KEY = _prerelease_key(())
+_IDENTIFIER_CHARS = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-'
+
+
+def _scan_version(text: str, strict: bool = False) -> Tuple[int, int, int, str, Optional[str]]:
+    # Splits a version string into (major, minor, patch, raw prerelease, build
+    # metadata) without a regex. Each separator is found once by a C-level
+    # partition/split, which beats a per-character Python loop on CPython.
+    if strict:
+        return _scan_strict(text)
+
+    if text[:1] == 'v':
+        text = text.lstrip('v')
+    core, plus, build_metadata = text.partition('+')
+    if not plus:
+        build_metadata = None
+    core, _, prerelease = core.partition('-')
+    parts = core.split('.')
+    if len(parts) == 3 and parts[2].isdecimal():
+        return int(parts[0]), int(parts[1]), int(parts[2]), prerelease, build_metadata
+
+    # Lenient forms: '1' and '1.2' default the missing fields to 0, '1.0.1b'
+    # keeps patch 1 and folds 'b' in front of the prerelease, and anything past
+    # the third component is ignored.
+    major = int(parts[0])
+    minor = int(parts[1]) if len(parts) > 1 else 0
+    if len(parts) < 3:
+        return major, minor, 0, prerelease, build_metadata
+    patch = parts[2]
+    digits = 0
+    while digits < len(patch) and patch[digits].isdecimal():
+        digits += 1
+    if not digits:
+        return major, minor, 0, prerelease, build_metadata
+    suffix = patch[digits:]
+    if suffix:
+        prerelease = f"{suffix}.{prerelease}" if prerelease else suffix
+    return major, minor, int(patch[:digits]), prerelease, build_metadata
+
+
+def _scan_strict(text: str) -> Tuple[int, int, int, str, Optional[str]]:
+    core, plus, build_metadata = text.partition('+')
+    if plus:
+        for identifier in build_metadata.split('.'):
+            if not identifier or identifier.strip(_IDENTIFIER_CHARS):
+                raise ValueError(f"Invalid SemVer 2.0.0 version: {text!r}")
+    else:
+        build_metadata = None
+
+    core, dash, prerelease = core.partition('-')
+    if dash:
+        for identifier in prerelease.split('.'):
+            if (not identifier or identifier.strip(_IDENTIFIER_CHARS)
+                    or (identifier.isdigit() and len(identifier) > 1 and identifier[0] == '0')):
+                raise ValueError(f"Invalid SemVer 2.0.0 version: {text!r}")
+
+    parts = core.split('.')
+    if len(parts) != 3:
+        raise ValueError(f"Invalid SemVer 2.0.0 version: {text!r}")
+    for number in parts:
+        if not (number.isdigit() and number.isascii()) or (len(number) > 1 and number[0] == '0'):
+            raise ValueError(f"Invalid SemVer 2.0.0 version: {text!r}")
+    return int(parts[0]), int(parts[1]), int(parts[2]), prerelease, build_metadata
+
+
+def _format_version(major: int, minor: int, patch: int,
+                    prerelease: Tuple[Union[int, str], ...], build_metadata: Optional[str]) -> str:
+    text = f"{major}.{minor}.{patch}"
+    if prerelease:
+        text += '-' + '.'.join(str(part) for part in prerelease)
+    if build_metadata is not None:
+        text += '+' + build_metadata
+    return text
+
+
+# Binary layout of Version.to_bytes(). Every integer is a length byte followed
+# by that many big-endian bytes, so longer numbers sort higher. A release ends
+# with _RELEASE, which sorts above the tag of any first prerelease identifier;
+# a prerelease is its tagged identifiers followed by _END. Text identifiers
+# are UTF-8 ending in 0x00, with NUL bytes escaped as 0x00 0xFF. The encoding
+# is prefix-free, so the optional build trailer never changes the order of
+# versions with different precedence.
+_END = 0x00
+_NUMERIC = 0x01
+_TEXT = 0x02
+_RELEASE = 0x03
+_BUILD = 0x2B
+_RECORD_HEADER = 2
+
+
+def _encode_uint(value: int, out: bytearray) -> None:
+    length = (value.bit_length() + 7) // 8
+    if length > 255:
+        raise ValueError(f"Version number too large to encode: {value}")
+    out.append(length)
+    out += value.to_bytes(length, 'big')
+
+
+def _decode_uint(data: bytes, position: int) -> Tuple[int, int]:
+    if position >= len(data) or position + 1 + data[position] > len(data):
+        raise ValueError("Invalid encoded version: truncated number")
+    end = position + 1 + data[position]
+    return int.from_bytes(data[position + 1:end], 'big'), end
+
+
+def _decode_tag(data: bytes, position: int) -> int:
+    if position >= len(data):
+        raise ValueError("Invalid encoded version: truncated prerelease")
+    return data[position]
+
+
+def _construct(cls, version, strict):
+    return cls._from_string(version, strict)
+
+
+_intern = lru_cache(maxsize=DEFAULT_CACHE_SIZE)(_construct)
 
 
 class Version:
-    def __init__(self, version):
-        self.original = version
-        self._parse_version(version)
-    
-    def _parse_version(self, version: str):
-        version = version.lstrip('v')
-        
-        if '+' in version:
-            version, self.build_metadata = version.split('+', 1)
-        else:
-            self.build_metadata = None
-        
+    # The prerelease is kept as the raw string slice from parsing and only
+    # decoded into identifiers (prerelease) and a sort key (_pre_key) when first
+    # needed; most comparisons are decided by _core alone. Versions built from
+    # parts (bumps, from_bytes) format their string form only when asked.
+    __slots__ = ('_original', 'major', 'minor', 'patch', 'build_metadata',
+                 '_core', '_raw_prerelease', '_prerelease', '_pre_key')
+
+    def __new__(cls, version, strict=False):
+        return _intern(cls, version, strict)
+
+    @classmethod
+    def _from_string(cls, version: str, strict: bool = False) -> 'Version':
+        major, minor, patch, raw_prerelease, build_metadata = _scan_version(version, strict)
+        self = cls._new(major, minor, patch, build_metadata, version)
+        if raw_prerelease:
+            set_field = object.__setattr__
+            set_field(self, '_raw_prerelease', raw_prerelease)
+            set_field(self, '_prerelease', None)
+            set_field(self, '_pre_key', None)
+        return self
+
+    @classmethod
+    def _from_parts(cls, major: int, minor: int, patch: int, prerelease: Tuple[Union[int, str], ...],
+                    build_metadata: Optional[str] = None, original: Optional[str] = None) -> 'Version':
+        self = cls._new(major, minor, patch, build_metadata, original)
+        if prerelease:
+            set_field = object.__setattr__
+            set_field(self, '_raw_prerelease', None)
+            set_field(self, '_prerelease', prerelease)
+            set_field(self, '_pre_key', None)
+        return self
 
+    @classmethod
+    def _new(cls, major: int, minor: int, patch: int, build_metadata: Optional[str],
+             original: Optional[str]) -> 'Version':
+        # A release: nothing to decode, so the prerelease fields are final.
+        self = object.__new__(cls)
+        set_field = object.__setattr__
+        set_field(self, '_original', original)
+        set_field(self, 'major', major)
+        set_field(self, 'minor', minor)
+        set_field(self, 'patch', patch)
+        set_field(self, 'build_metadata', build_metadata)
+        set_field(self, '_core', (major, minor, patch))
+        set_field(self, '_raw_prerelease', '')
+        set_field(self, '_prerelease', ())
+        set_field(self, '_pre_key', _RELEASE_KEY)
+        return self
 
-        if '-' in version:
-            main_version, prerelease = version.split('-', 1)
+    @property
+    def original(self) -> str:
+        original = self._original
+        if original is None:
+            original = _format_version(self.major, self.minor, self.patch, self.prerelease, self.build_metadata)
+            object.__setattr__(self, '_original', original)
+        return original
+
+    @property
+    def prerelease(self) -> Tuple[Union[int, str], ...]:
+        prerelease = self._prerelease
+        if prerelease is None:
+            prerelease = self._parse_prerelease(self._raw_prerelease)
+            object.__setattr__(self, '_prerelease', prerelease)
+        return prerelease
+
+    def _decode_pre_key(self) -> Tuple:
+        pre_key = self._pre_key
+        if pre_key is None:
+            pre_key = _prerelease_key(self.prerelease)
+            object.__setattr__(self, '_pre_key', pre_key)
+        return pre_key
+
+    @property
+    def _key(self) -> Tuple:
+        return self._core + (self._pre_key or self._decode_pre_key(),)
+
+    # Bumps follow npm's inc(): build metadata is dropped, and bumping a
+    # prerelease to the release it leads up to just drops the prerelease
+    # (1.0.0-rc.1 -> major -> 1.0.0, 1.2.3-rc.1 -> patch -> 1.2.3).
+    # _prerelease is () only for releases; None means "not decoded yet".
+
+    def bump_major(self) -> 'Version':
+        if self._prerelease != () and self.minor == 0 and self.patch == 0:
+            return self._from_parts(self.major, 0, 0, ())
+        return self._from_parts(self.major + 1, 0, 0, ())
+
+    def bump_minor(self) -> 'Version':
+        if self._prerelease != () and self.patch == 0:
+            return self._from_parts(self.major, self.minor, 0, ())
+        return self._from_parts(self.major, self.minor + 1, 0, ())
+
+    def bump_patch(self) -> 'Version':
+        if self._prerelease != ():
+            return self._from_parts(self.major, self.minor, self.patch, ())
+        return self._from_parts(self.major, self.minor, self.patch + 1, ())
+
+    def bump_prerelease(self, label: Optional[str] = None) -> 'Version':
+        """Next prerelease: 1.2.3 -> 1.2.4-0 (or 1.2.4-<label>.0), 1.2.4-rc.1 -> 1.2.4-rc.2.
+
+        A label different from the current first identifier restarts the
+        counter: 1.2.4-alpha.3 with label 'beta' -> 1.2.4-beta.0.
+        """
+        if label is not None:
+            if not label or '.' in label or label.strip(_IDENTIFIER_CHARS):
+                raise ValueError(f"Invalid prerelease label: {label!r}")
+            label = int(label) if label.isdigit() else label
+        if self._prerelease == ():
+            prerelease = (label, 0) if label is not None else (0,)
+            return self._from_parts(self.major, self.minor, self.patch + 1, prerelease)
+
+        identifiers = list(self.prerelease)
+        if label is not None and identifiers[0] != label:
+            identifiers = [label, 0]
         else:
-            main_version = version
-            prerelease = None
-        
-        main_parts = main_version.split('.')
-        self.major = int(main_parts[0]) if len(main_parts) > 0 else 0
-        self.minor = int(main_parts[1]) if len(main_parts) > 1 else 0
-        
-        if len(main_parts) >= 3:
-            patch_part = main_parts[2]
-            match = re.match(r'(\d+)(.*)$', patch_part)
-            if match:
-                self.patch = int(match.group(1))
-                suffix = match.group(2)
-                if suffix:
-                    prerelease = suffix if not prerelease else f"{suffix}.{prerelease}"
+            for index in range(len(identifiers) - 1, -1, -1):
+                if isinstance(identifiers[index], int):
+                    identifiers[index] += 1
+                    break
             else:
-                self.patch = 0
+                identifiers.append(0)
+        return self._from_parts(self.major, self.minor, self.patch, tuple(identifiers))
+
+    @staticmethod
+    def cache_info():
+        """Hits, misses, maxsize and current size of the intern cache."""
+        return _intern.cache_info()
+
+    @staticmethod
+    def cache_clear() -> None:
+        """Drop every interned instance and reset the hit/miss counters."""
+        _intern.cache_clear()
+
+    @staticmethod
+    def set_cache_size(maxsize: Optional[int]) -> None:
+        """Replace the intern cache with an empty one holding at most maxsize entries.
+
+        None makes the cache unbounded and 0 disables interning.
+        """
+        global _intern
+        _intern = lru_cache(maxsize=maxsize)(_construct)
+
+    def to_bytes(self, include_build: bool = False) -> bytes:
+        """Order-preserving binary form: comparing the bytes compares precedence.
+
+        With include_build the build metadata is appended as a trailer; versions
+        that differ only in build metadata then stay adjacent but are no longer
+        equal byte-wise.
+        """
+        out = bytearray()
+        _encode_uint(self.major, out)
+        _encode_uint(self.minor, out)
+        _encode_uint(self.patch, out)
+        if self.prerelease:
+            for part in self.prerelease:
+                if isinstance(part, int):
+                    out.append(_NUMERIC)
+                    _encode_uint(part, out)
+                else:
+                    out.append(_TEXT)
+                    out += part.encode('utf-8').replace(b'\x00', b'\x00\xff')
+                    out.append(_END)
+            out.append(_END)
         else:
-            self.patch = 0
-        
-        self.prerelease = self._parse_prerelease(prerelease) if prerelease else []
+            out.append(_RELEASE)
+        if include_build and self.build_metadata is not None:
+            out.append(_BUILD)
+            out += self.build_metadata.encode('utf-8')
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview]) -> 'Version':
+        """Rebuild a Version from to_bytes() output; str() gives the canonical spelling."""
+        # Records are a few bytes long, so one copy into bytes buys the C-level
+        # find() and slicing used below.
+        data = bytes(data)
+        major, position = _decode_uint(data, 0)
+        minor, position = _decode_uint(data, position)
+        patch, position = _decode_uint(data, position)
+        prerelease = []
+        tag = _decode_tag(data, position)
+        position += 1
+        while tag != _RELEASE and tag != _END:
+            if tag == _NUMERIC:
+                part, position = _decode_uint(data, position)
+            elif tag == _TEXT:
+                end = data.find(b'\x00', position)
+                while data[end + 1:end + 2] == b'\xff':
+                    end = data.find(b'\x00', end + 2)
+                if end < 0:
+                    raise ValueError("Invalid encoded version: unterminated identifier")
+                part = data[position:end].replace(b'\x00\xff', b'\x00').decode('utf-8')
+                position = end + 1
+            else:
+                raise ValueError(f"Invalid encoded version: unexpected tag {tag:#04x}")
+            prerelease.append(part)
+            tag = _decode_tag(data, position)
+            position += 1
+        build_metadata = None
+        if position < len(data):
+            if data[position] != _BUILD:
+                raise ValueError("Invalid encoded version: trailing bytes")
+            build_metadata = data[position + 1:].decode('utf-8')
+        return cls._from_parts(major, minor, patch, tuple(prerelease), build_metadata)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} instances are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} instances are immutable")
+
+    def __reduce__(self):
+        return (type(self), (self.original,))
     
-    def _parse_prerelease(self, prerelease: str) -> List[Union[int, str]]:
+    @staticmethod
+    def _parse_prerelease(prerelease: str) -> Tuple[Union[int, str], ...]:
         if not prerelease:
-            return []
+            return ()
         
         identifiers = []
         for part in prerelease.split('.'):
@@ -53,73 +358,50 @@ class Version:
             else:
                 identifiers.append(part)
         
-        return identifiers
-    
-    def _compare_prerelease(self, other_prerelease: List[Union[int, str]]) -> int:
-        if not self.prerelease and not other_prerelease:
-            return 0
-        if not self.prerelease:
-            return 1 
-        if not other_prerelease:
-            return -1  
-        min_length = min(len(self.prerelease), len(other_prerelease))
-        
-        for i in range(min_length):
-            left, right = self.prerelease[i], other_prerelease[i]
-            
-            if isinstance(left, int) and isinstance(right, int):
-                if left != right:
-                    return -1 if left < right else 1
-            elif isinstance(left, int) and isinstance(right, str):
-                return -1
-            elif isinstance(left, str) and isinstance(right, int):
-                return 1
-            else:
-                if left != right:
-                    return -1 if left < right else 1
-        
-        if len(self.prerelease) != len(other_prerelease):
-            return -1 if len(self.prerelease) < len(other_prerelease) else 1
-        
-        return 0
+        return tuple(identifiers)
     
     def __lt__(self, other):
         if not isinstance(other, Version):
             return NotImplemented
-        
-        self_core = (self.major, self.minor, self.patch)
-        other_core = (other.major, other.minor, other.patch)
-        
-        if self_core != other_core:
-            return self_core < other_core
-        
-        return self._compare_prerelease(other.prerelease) < 0
+        if self._core != other._core:
+            return self._core < other._core
+        return (self._pre_key or self._decode_pre_key()) < (other._pre_key or other._decode_pre_key())
     
     def __le__(self, other):
-        return self < other or self == other
+        if not isinstance(other, Version):
+            return NotImplemented
+        if self._core != other._core:
+            return self._core <= other._core
+        return (self._pre_key or self._decode_pre_key()) <= (other._pre_key or other._decode_pre_key())
     
     def __gt__(self, other):
         if not isinstance(other, Version):
             return NotImplemented
-        return not (self <= other)
+        if self._core != other._core:
+            return self._core > other._core
+        return (self._pre_key or self._decode_pre_key()) > (other._pre_key or other._decode_pre_key())
     
     def __ge__(self, other):
-        return self > other or self == other
+        if not isinstance(other, Version):
+            return NotImplemented
+        if self._core != other._core:
+            return self._core >= other._core
+        return (self._pre_key or self._decode_pre_key()) >= (other._pre_key or other._decode_pre_key())
     
     def __eq__(self, other):
         if not isinstance(other, Version):
             return NotImplemented
-        
-        return (
-            self.major == other.major and
-            self.minor == other.minor and
-            self.patch == other.patch and
-            self.prerelease == other.prerelease
-        )
+        return self._core == other._core and (
+            (self._pre_key or self._decode_pre_key()) == (other._pre_key or other._decode_pre_key()))
     
     def __ne__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
         return not self == other
     
+    def __hash__(self):
+        return hash(self._key)
+    
     def __str__(self):
         return self.original
     
@@ -127,6 +409,49 @@ class Version:
         return f"Version('{self.original}')"
 
 
+def sort_key(version: str, strict: bool = False) -> Tuple:
+    """Precedence key of a version string, equal to Version(version)'s, without building a Version."""
+    major, minor, patch, prerelease, _ = _scan_version(version, strict)
+    return (major, minor, patch, _prerelease_key(Version._parse_prerelease(prerelease)))
+
+
+def bump_many(versions: Iterable[Union[Version, str]], part: str, label: Optional[str] = None) -> List[Version]:
+    """Bump every version by part ('major', 'minor', 'patch' or 'prerelease') in one pass."""
+    if part not in ('major', 'minor', 'patch', 'prerelease'):
+        raise ValueError(f"Unknown version part: {part!r}")
+    bump = getattr(Version, f"bump_{part}")
+    if part == 'prerelease':
+        return [bump(v if isinstance(v, Version) else Version(v), label) for v in versions]
+    return [bump(v if isinstance(v, Version) else Version(v)) for v in versions]
+
+
+def pack_versions(versions: Iterable[Version], include_build: bool = False) -> bytes:
+    """Concatenate to_bytes() records, each preceded by a 2-byte big-endian length."""
+    out = bytearray()
+    for version in versions:
+        record = version.to_bytes(include_build)
+        out += len(record).to_bytes(_RECORD_HEADER, 'big')
+        out += record
+    return bytes(out)
+
+
+def iter_packed(buffer: Union[bytes, bytearray, memoryview]) -> Iterator[memoryview]:
+    """Zero-copy memoryview of each record in a pack_versions() buffer."""
+    view = memoryview(buffer)
+    position = 0
+    while position < len(view):
+        start = position + _RECORD_HEADER
+        end = start + int.from_bytes(view[position:start], 'big')
+        if end > len(view):
+            raise ValueError("Truncated packed version buffer")
+        yield view[start:end]
+        position = end
+
+
+def unpack_versions(buffer: Union[bytes, bytearray, memoryview]) -> List[Version]:
+    return [Version.from_bytes(record) for record in iter_packed(buffer)]
+
+
 def main():
     to_test = [
         ("1.0.0", "2.0.0"),
@@ -171,6 +496,58 @@ def main():
     v2 = Version('1.0.0+different.metadata')
     print(f"Version('1.0.0+20130313144700') == Version('1.0.0+different.metadata'): {v1 == v2}")
     assert v1 == v2, "Build metadata should be ignored in comparisons"
+    assert hash(v1) == hash(v2), "Equal versions must hash equally"
+    
+    print("\nTesting sort order:")
+    shuffled = [Version(v) for v in reversed(versions)]
+    result = [str(v) for v in sorted(shuffled)]
+    print(f"sorted(reversed(precedence)) == precedence: {result == versions}")
+    assert result == versions, "sorted() must follow semver precedence"
+    
+    print("\nTesting strict SemVer 2.0.0 mode:")
+    assert Version('1.0.0-alpha.1+001', strict=True) == Version('1.0.0-alpha.1')
+    for invalid in ['v1.0.0', '1.0', '01.0.0', '1.0.0-01', '1.0.1b', '1.0.0-alpha..1', '1.0.0+']:
+        try:
+            Version(invalid, strict=True)
+        except ValueError:
+            print(f"Version('{invalid}', strict=True) rejected")
+        else:
+            raise AssertionError(f"strict mode accepted {invalid}")
+    
+    print("\nTesting binary encoding:")
+    encoded = [Version(v).to_bytes() for v in versions]
+    print(f"to_bytes() order == precedence order: {encoded == sorted(encoded)}")
+    assert encoded == sorted(encoded), "to_bytes() must preserve precedence"
+    for text in versions + ['1.0.0+20130313144700', 'v1.0.1b']:
+        decoded = Version.from_bytes(Version(text).to_bytes(include_build=True))
+        assert decoded == Version(text) and decoded.build_metadata == Version(text).build_metadata
+    assert unpack_versions(pack_versions(Version(v) for v in versions)) == [Version(v) for v in versions]
+    
+    print("\nTesting version bumps:")
+    bumps = [
+        ('1.2.3', 'major', '2.0.0'), ('1.2.3', 'minor', '1.3.0'), ('1.2.3', 'patch', '1.2.4'),
+        ('1.2.3', 'prerelease', '1.2.4-0'), ('1.2.4-rc.1', 'prerelease', '1.2.4-rc.2'),
+        ('2.0.0-rc.1', 'major', '2.0.0'), ('1.2.3-rc.1+build', 'patch', '1.2.3'),
+    ]
+    for start, part, expected in bumps:
+        bumped = bump_many([start], part)[0]
+        print(f"Version('{start}').bump_{part}() == Version('{expected}'): {str(bumped) == expected}")
+        assert bumped == Version(expected) and str(bumped) == expected, f"bump failed: {start} {part}"
+    assert str(Version('1.2.4-alpha.3').bump_prerelease('beta')) == '1.2.4-beta.0'
+    
+    print("\nTesting intern cache:")
+    Version.cache_clear()
+    first, second = Version('2.0.0-rc.1'), Version('2.0.0-rc.1')
+    print(f"Version('2.0.0-rc.1') is Version('2.0.0-rc.1'): {first is second}")
+    assert first is second, "Repeated strings should return the interned instance"
+    info = Version.cache_info()
+    assert (info.hits, info.misses) == (1, 1), f"unexpected cache counters: {info}"
+    try:
+        first.major = 3
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("Interned versions must be immutable")
     
     print("\nAll tests passed!")
 
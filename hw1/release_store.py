@@ -0,0 +1,195 @@
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from hw1 import Version
+from version_range import VersionRange
+
+
+DEFAULT_BATCH_SIZE = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS releases (
+    package TEXT NOT NULL,
+    version_key BLOB NOT NULL,
+    version TEXT NOT NULL,
+    released_at,
+    artifact_url TEXT,
+    metadata TEXT,
+    PRIMARY KEY (package, version_key)
+) WITHOUT ROWID
+"""
+
+UPSERT = """
+INSERT INTO releases (package, version_key, version, released_at, artifact_url, metadata)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (package, version_key) DO UPDATE SET
+    version = excluded.version,
+    released_at = excluded.released_at,
+    artifact_url = excluded.artifact_url,
+    metadata = excluded.metadata
+"""
+
+SELECT = "SELECT package, version_key, version, released_at, artifact_url, metadata FROM releases"
+
+
+class Release(NamedTuple):
+    package: str
+    version: Version
+    released_at: Any = None
+    artifact_url: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class ReleaseStore:
+    """Release metadata in SQLite, keyed by Version.to_bytes().
+
+    The key column is a BLOB in a WITHOUT ROWID primary key, and SQLite
+    orders BLOBs with memcmp, so the index order is SemVer precedence.
+    Range and prefix queries are therefore index range scans. Versions that
+    differ only in build metadata share a row, as they compare equal.
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(SCHEMA)
+        self.connection.commit()
+
+    def __enter__(self) -> 'ReleaseStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def upsert(self, package: str, version: Union[Version, str], released_at: Any = None,
+               artifact_url: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.upsert_many([Release(package, _as_version(version), released_at, artifact_url, metadata)])
+
+    def upsert_many(self, releases: Iterable[Union[Release, Tuple]], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Insert or replace releases, committing one transaction per batch_size rows."""
+        count = 0
+        batch: List[Tuple] = []
+        for release in releases:
+            release = Release(*release)
+            version = _as_version(release.version)
+            metadata = json.dumps(release.metadata) if release.metadata is not None else None
+            batch.append((release.package, version.to_bytes(), str(version),
+                          release.released_at, release.artifact_url, metadata))
+            if len(batch) >= batch_size:
+                count += self._write_batch(batch)
+                batch = []
+        if batch:
+            count += self._write_batch(batch)
+        return count
+
+    def _write_batch(self, batch: List[Tuple]) -> int:
+        with self.connection:
+            self.connection.executemany(UPSERT, batch)
+        return len(batch)
+
+    def get(self, package: str, version: Union[Version, str]) -> Optional[Release]:
+        row = self.connection.execute(
+            f"{SELECT} WHERE package = ? AND version_key = ?",
+            (package, _as_version(version).to_bytes())
+        ).fetchone()
+        return _release(row) if row else None
+
+    def delete(self, package: str, version: Union[Version, str]) -> bool:
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM releases WHERE package = ? AND version_key = ?",
+                (package, _as_version(version).to_bytes())
+            )
+        return cursor.rowcount > 0
+
+    def count(self, package: Optional[str] = None) -> int:
+        if package is None:
+            return self.connection.execute("SELECT COUNT(*) FROM releases").fetchone()[0]
+        return self.connection.execute("SELECT COUNT(*) FROM releases WHERE package = ?", (package,)).fetchone()[0]
+
+    def between(self, package: str, lower: Union[Version, str, None] = None,
+                upper: Union[Version, str, None] = None) -> Iterator[Release]:
+        """Releases with lower <= version <= upper in precedence order; None is unbounded."""
+        clauses, params = [], [package]
+        if lower is not None:
+            clauses.append("version_key >= ?")
+            params.append(_as_version(lower).to_bytes())
+        if upper is not None:
+            clauses.append("version_key <= ?")
+            params.append(_as_version(upper).to_bytes())
+        return self._scan(clauses, params)
+
+    def scan(self, package: str, constraint: Union[VersionRange, str]) -> Iterator[Release]:
+        """Releases inside a range expression, one index range scan per interval."""
+        if not isinstance(constraint, VersionRange):
+            constraint = VersionRange(constraint)
+        for interval in constraint.intervals:
+            clauses, params = [], [package]
+            if interval.lower is not None:
+                clauses.append("version_key >= ?" if interval.lower_inclusive else "version_key > ?")
+                params.append(interval.lower.to_bytes())
+            if interval.upper is not None:
+                clauses.append("version_key <= ?" if interval.upper_inclusive else "version_key < ?")
+                params.append(interval.upper.to_bytes())
+            yield from self._scan(clauses, params)
+
+    def prefix(self, package: str, prefix: str) -> Iterator[Release]:
+        """Releases whose version starts with prefix, e.g. '1.4.*' or '1.4', prereleases included."""
+        parts = prefix.lstrip('v').split('.')
+        while parts and parts[-1] in ('*', 'x', 'X', ''):
+            parts.pop()
+        if len(parts) > 3:
+            raise ValueError(f"Invalid version prefix: {prefix!r}")
+        try:
+            numbers = [int(part) for part in parts]
+        except ValueError:
+            raise ValueError(f"Invalid version prefix: {prefix!r}")
+        # Leading numbers are encoded the same way in every key that shares
+        # them, so the prefix is a byte prefix of the index key.
+        key = Version._from_parts(*(numbers + [0] * (3 - len(numbers))), ()).to_bytes()
+        key_prefix = key[:_offset(key, len(numbers))]
+        if not key_prefix:
+            return self._scan([], [package])
+        return self._scan(["version_key >= ?", "version_key < ?"], [package, key_prefix, _successor(key_prefix)])
+
+    def latest(self, package: str) -> Optional[Release]:
+        row = self.connection.execute(
+            f"{SELECT} WHERE package = ? ORDER BY version_key DESC LIMIT 1", (package,)
+        ).fetchone()
+        return _release(row) if row else None
+
+    def _scan(self, clauses: List[str], params: List[Any]) -> Iterator[Release]:
+        where = ' AND '.join(["package = ?"] + clauses)
+        cursor = self.connection.execute(f"{SELECT} WHERE {where} ORDER BY version_key", params)
+        return map(_release, cursor)
+
+
+def _as_version(version: Union[Version, str]) -> Version:
+    return version if isinstance(version, Version) else Version(version)
+
+
+def _offset(key: bytes, index: int) -> int:
+    # Start of the index-th length-prefixed number in a to_bytes() key.
+    position = 0
+    for _ in range(index):
+        position += 1 + key[position]
+    return position
+
+
+def _successor(prefix: bytes) -> bytes:
+    # Smallest byte string greater than every string starting with prefix.
+    stripped = prefix.rstrip(b'\xff')
+    return stripped[:-1] + bytes([stripped[-1] + 1])
+
+
+def _release(row: Tuple) -> Release:
+    package, version_key, version, released_at, artifact_url, metadata = row
+    # The key leaves build metadata out, so only versions carrying it are parsed from the text.
+    version = Version(version) if '+' in version else Version.from_bytes(version_key)
+    return Release(package, version, released_at, artifact_url,
+                   json.loads(metadata) if metadata is not None else None)
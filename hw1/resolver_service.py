@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from hw1 import Version
+from version_index import VersionIndex
+from version_range import VersionRange
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_DELAY_MS = 0.0
+LATENCY_WINDOW = 10_000
+MAX_BODY = 8 * 1024 * 1024
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+Query = Tuple[str, str]
+
+_parse_range = lru_cache(maxsize=4096)(VersionRange)
+
+
+class Registry:
+    """Sorted VersionIndex per package, built once from a JSON registry snapshot.
+
+    The snapshot maps package names either to a list of version strings or
+    to an object whose "versions" member is such a list, or a mapping keyed
+    by version as in npm registry documents. Unparsable versions are skipped
+    and counted rather than failing the whole load.
+    """
+
+    def __init__(self, indexes: Dict[str, VersionIndex], skipped: int = 0):
+        self.indexes = indexes
+        self.skipped = skipped
+
+    @classmethod
+    def from_snapshot(cls, path: str) -> 'Registry':
+        with open(path, 'r', encoding='utf-8') as file:
+            snapshot = json.load(file)
+        if not isinstance(snapshot, dict):
+            raise ValueError(f"Registry snapshot must be a JSON object: {path}")
+        indexes = {}
+        skipped = 0
+        for package, entry in snapshot.items():
+            if isinstance(entry, dict):
+                entry = entry.get('versions', ())
+            versions = []
+            for text in entry:
+                try:
+                    versions.append(Version(text))
+                except (TypeError, ValueError):
+                    skipped += 1
+            indexes[package] = VersionIndex(versions)
+        return cls(indexes, skipped)
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def version_count(self) -> int:
+        return sum(map(len, self.indexes.values()))
+
+    def max_satisfying(self, package: str, constraint: str) -> Optional[Version]:
+        index = self.indexes.get(package)
+        if index is None:
+            return None
+        return index.max_satisfying(_parse_range(constraint))
+
+
+class LatencyStats:
+    """Request counters plus a sliding window of latencies for percentiles."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.started = time.monotonic()
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.queries = 0
+        self.batches = 0
+        self.batched_queries = 0
+        self.errors = 0
+
+    def record(self, seconds: float) -> None:
+        self.requests += 1
+        self.latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 3)
+
+        return {
+            'uptime_s': round(time.monotonic() - self.started, 3),
+            'requests': self.requests,
+            'queries': self.queries,
+            'errors': self.errors,
+            'batches': self.batches,
+            'mean_batch_size': round(self.batched_queries / self.batches, 2) if self.batches else 0.0,
+            'latency_ms': {'window': len(ordered), 'p50': percentile(0.5), 'p90': percentile(0.9),
+                           'p99': percentile(0.99), 'max': percentile(1.0)},
+        }
+
+
+class BatchingResolver:
+    """Coalesces concurrent resolve() calls into batches answered in one pass.
+
+    Callers enqueue their queries with a future; a single worker task drains
+    whatever is queued (up to max_batch queries, optionally waiting max_delay
+    seconds for more), answers each distinct (package, range) pair once and
+    resolves all the futures. Lookups are CPU-bound bisections, so batching
+    saves event loop round trips and repeated work rather than adding
+    parallelism.
+    """
+
+    def __init__(self, registry: Registry, stats: LatencyStats, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_delay: float = DEFAULT_MAX_DELAY_MS / 1000):
+        self.registry = registry
+        self.stats = stats
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def resolve(self, queries: List[Query]) -> List[Dict[str, Any]]:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((queries, future))
+        return await future
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            size = len(batch[0][0])
+            if self.max_delay and size < self.max_batch:
+                await asyncio.sleep(self.max_delay)
+            while size < self.max_batch and not queue.empty():
+                item = queue.get_nowait()
+                batch.append(item)
+                size += len(item[0])
+            self._answer(batch, size)
+
+    def _answer(self, batch: List[Tuple[List[Query], asyncio.Future]], size: int) -> None:
+        stats = self.stats
+        stats.batches += 1
+        stats.batched_queries += size
+        answers: Dict[Query, Dict[str, Any]] = {}
+        for queries, future in batch:
+            results = []
+            try:
+                for query in queries:
+                    answer = answers.get(query)
+                    if answer is None:
+                        answer = answers[query] = self._lookup(*query)
+                    results.append(answer)
+            except Exception as e:
+                # Fail only this request: an exception escaping _run() would
+                # end the worker and leave every queued request waiting.
+                stats.errors += 1
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(results)
+
+    def _lookup(self, package: str, constraint: str) -> Dict[str, Any]:
+        try:
+            version = self.registry.max_satisfying(package, constraint)
+        except ValueError as e:
+            self.stats.errors += 1
+            return {'package': package, 'range': constraint, 'error': str(e)}
+        return {'package': package, 'range': constraint, 'version': str(version) if version is not None else None}
+
+
+class ResolverService:
+    """Minimal HTTP/1.1 front end over asyncio streams.
+
+    POST /resolve  {"queries": [{"package": "left-pad", "range": "^1.2"}, ...]}
+                   (or a bare list of [package, range] pairs)
+    GET  /stats    request counts, batch sizes and p50/p90/p99 latency
+    Connections are kept alive unless the client sends "Connection: close".
+    """
+
+    def __init__(self, registry: Registry, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_delay: float = DEFAULT_MAX_DELAY_MS / 1000):
+        self.registry = registry
+        self.stats = LatencyStats()
+        self.resolver = BatchingResolver(registry, self.stats, max_batch, max_delay)
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> Tuple[str, int]:
+        await self.resolver.start()
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        await self.resolver.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                started = time.perf_counter()
+                method, path, headers, body = request
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                self.stats.record(time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as e:
+            _write_response(writer, 400, {'error': str(e)}, keep_alive=False)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        path = path.split('?', 1)[0]
+        if path == '/stats':
+            if method != 'GET':
+                return 405, {'error': 'use GET'}
+            stats = self.stats.snapshot()
+            stats['packages'] = len(self.registry)
+            stats['versions'] = self.registry.version_count()
+            stats['skipped_versions'] = self.registry.skipped
+            return 200, stats
+        if path == '/resolve':
+            if method != 'POST':
+                return 405, {'error': 'use POST'}
+            try:
+                queries = _parse_queries(json.loads(body))
+            except (ValueError, TypeError, KeyError) as e:
+                self.stats.errors += 1
+                return 400, {'error': f"Invalid resolve request: {e}"}
+            self.stats.queries += len(queries)
+            try:
+                return 200, {'results': await self.resolver.resolve(queries)}
+            except Exception as e:
+                return 500, {'error': f"Resolve failed: {e}"}
+        return 404, {'error': f"Unknown path: {path}"}
+
+
+def _parse_queries(payload: Any) -> List[Query]:
+    if isinstance(payload, dict):
+        payload = payload['queries']
+    if not isinstance(payload, list):
+        raise TypeError('expected a list of queries')
+    queries = []
+    for item in payload:
+        package, constraint = (item['package'], item.get('range', '*')) if isinstance(item, dict) else item
+        if not isinstance(package, str) or not isinstance(constraint, str):
+            raise TypeError('package and range must be strings')
+        queries.append((package, constraint))
+    return queries
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode('latin-1').split()
+    if len(parts) != 3:
+        raise ValueError('Malformed request line')
+    method, path, _ = parts
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY:
+        raise ValueError('Request body too large')
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), path, headers, body
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool) -> None:
+    body = json.dumps(payload).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode('latin-1') + body)
+
+
+class ResolverClient:
+    """Keep-alive client for the service, used by the tests and benchmarks."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def __aenter__(self) -> 'ResolverClient':
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    async def request(self, method: str, path: str, payload: Any = None) -> Tuple[int, Any]:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self._writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                           f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+        await self._writer.drain()
+        status = int((await self._reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        return status, json.loads(await self._reader.readexactly(length))
+
+    async def resolve(self, queries: List[Query]) -> List[Dict[str, Any]]:
+        status, payload = await self.request('POST', '/resolve', {'queries': [
+            {'package': package, 'range': constraint} for package, constraint in queries
+        ]})
+        if status != 200:
+            raise ValueError(payload.get('error', f"HTTP {status}"))
+        return payload['results']
+
+
+def parse_arguments(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='Serve max-satisfying version lookups from a JSON registry snapshot',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python resolver_service.py registry.json --port 8080
+  curl -d '{"queries": [{"package": "left-pad", "range": "^1.2"}]}' localhost:8080/resolve
+  curl localhost:8080/stats
+        """
+    )
+    parser.add_argument('snapshot', help='JSON registry snapshot: {"package": ["1.0.0", ...], ...}')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Address to bind (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to bind (default: {DEFAULT_PORT})')
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH,
+                        help=f'Most queries answered per batch (default: {DEFAULT_MAX_BATCH})')
+    parser.add_argument('--max-delay-ms', type=float, default=DEFAULT_MAX_DELAY_MS,
+                        help='How long a batch waits for more queries (default: 0, batch what is already queued)')
+    return parser.parse_args(argv)
+
+
+async def serve(args) -> None:
+    service = ResolverService(Registry.from_snapshot(args.snapshot), args.max_batch, args.max_delay_ms / 1000)
+    host, port = await service.start(args.host, args.port)
+    print(f"Serving {len(service.registry):,} packages ({service.registry.version_count():,} versions) "
+          f"on http://{host}:{port}", file=sys.stderr)
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point of the script."""
+    args = parse_arguments(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,396 @@
+import asyncio
+import bisect
+import io
+import json
+import os
+import pickle
+import random
+import tempfile
+import unittest
+from functools import cmp_to_key
+from unittest import mock
+
+from bulk import sort_versions
+from hw1 import Version, bump_many, pack_versions, sort_key, unpack_versions
+from version_array import VersionArray
+from release_store import ReleaseStore
+from resolver_service import Registry, ResolverClient, ResolverService
+from version_index import VersionIndex
+from version_sort import ENTRY_OVERHEAD, MAX_FAN_IN, ExternalVersionSorter
+from version_range import VersionRange
+
+
+SAMPLES = 2000
+ALPHANUMERIC = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-'
+
+
+def random_identifier(rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        return str(rng.choice([0, 1, 2, 9, 10, 11, rng.randint(0, 10 ** 6)]))
+    length = rng.randint(1, 6)
+    return ''.join(rng.choice(ALPHANUMERIC + '0123456789') for _ in range(length)).lstrip('0123456789') or 'x'
+
+
+def random_semver(rng: random.Random) -> str:
+    """A valid SemVer 2.0.0 string, biased towards collisions on small numbers."""
+    text = '.'.join(str(rng.choice([0, 1, 2, rng.randint(0, 30)])) for _ in range(3))
+    if rng.random() < 0.5:
+        text += '-' + '.'.join(random_identifier(rng) for _ in range(rng.randint(1, 3)))
+    if rng.random() < 0.3:
+        text += '+' + '.'.join(random_identifier(rng) for _ in range(rng.randint(1, 2)))
+    return text
+
+
+def reference_compare(left: str, right: str) -> int:
+    """SemVer 2.0.0 precedence written straight from the spec, as a test oracle."""
+    def split(text):
+        core, _, prerelease = text.partition('+')[0].partition('-')
+        return [int(part) for part in core.split('.')], prerelease.split('.') if prerelease else []
+
+    (left_core, left_pre), (right_core, right_pre) = split(left), split(right)
+    if left_core != right_core:
+        return -1 if left_core < right_core else 1
+    if not left_pre or not right_pre:
+        return (not left_pre) - (not right_pre)
+    for a, b in zip(left_pre, right_pre):
+        if a == b:
+            continue
+        if a.isdigit() and b.isdigit():
+            return -1 if int(a) < int(b) else 1
+        if a.isdigit() or b.isdigit():
+            return -1 if a.isdigit() else 1
+        return -1 if a < b else 1
+    return (len(left_pre) > len(right_pre)) - (len(left_pre) < len(right_pre))
+
+
+class VersionPropertyTests(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(20240601)
+        self.strings = [random_semver(self.rng) for _ in range(SAMPLES)]
+        self.versions = [Version(text) for text in self.strings]
+
+    def pairs(self):
+        for _ in range(SAMPLES * 5):
+            yield self.rng.randrange(SAMPLES), self.rng.randrange(SAMPLES)
+
+    def test_total_order_matches_reference(self):
+        for i, j in self.pairs():
+            a, b = self.versions[i], self.versions[j]
+            expected = reference_compare(self.strings[i], self.strings[j])
+            self.assertEqual(expected < 0, a < b, (a, b))
+            self.assertEqual(expected <= 0, a <= b, (a, b))
+            self.assertEqual(expected > 0, a > b, (a, b))
+            self.assertEqual(expected >= 0, a >= b, (a, b))
+            self.assertEqual(expected == 0, a == b, (a, b))
+            self.assertEqual(expected != 0, a != b, (a, b))
+            self.assertEqual(1, [a < b, a == b, a > b].count(True))
+
+    def test_antisymmetry(self):
+        for i, j in self.pairs():
+            a, b = self.versions[i], self.versions[j]
+            if a <= b and b <= a:
+                self.assertEqual(a, b)
+
+    def test_transitivity(self):
+        for _ in range(SAMPLES * 5):
+            a, b, c = sorted(self.rng.sample(self.versions, 3))
+            self.assertLessEqual(a, c)
+            if a < b or b < c:
+                self.assertLess(a, c)
+
+    def test_hash_consistent_with_eq(self):
+        for i, j in self.pairs():
+            a, b = self.versions[i], self.versions[j]
+            if a == b:
+                self.assertEqual(hash(a), hash(b))
+        self.assertEqual(len(set(self.versions)), len({sort_key(text) for text in self.strings}))
+
+    def test_build_metadata_ignored(self):
+        for text in self.strings[:200]:
+            base = text.partition('+')[0]
+            with_build = Version(base + '+build.' + str(self.rng.randint(0, 999)))
+            self.assertEqual(Version(base), with_build)
+            self.assertEqual(hash(Version(base)), hash(with_build))
+            self.assertFalse(Version(base) < with_build or with_build < Version(base))
+
+    def test_sorted_matches_reference(self):
+        expected = sorted(self.strings, key=cmp_to_key(reference_compare))
+        self.assertEqual([sort_key(text) for text in expected],
+                         [v._key for v in sorted(self.versions)])
+
+    def test_strict_accepts_generated_semver(self):
+        for text in self.strings:
+            self.assertEqual(Version(text, strict=True), Version(text))
+
+    def test_sort_key_matches_version(self):
+        for text in self.strings:
+            self.assertEqual(sort_key(text), Version(text)._key)
+
+    def test_to_bytes_preserves_order_and_round_trips(self):
+        for i, j in self.pairs():
+            a, b = self.versions[i], self.versions[j]
+            self.assertEqual(a < b, a.to_bytes() < b.to_bytes())
+            self.assertEqual(a == b, a.to_bytes() == b.to_bytes())
+        decoded = unpack_versions(pack_versions(self.versions, include_build=True))
+        self.assertEqual(decoded, self.versions)
+        self.assertEqual([v.build_metadata for v in decoded], [v.build_metadata for v in self.versions])
+
+    def test_from_bytes_rejects_truncated_input(self):
+        for data in (b'', b'\x01', b'\x01\x01', b'\x05\x01'):
+            with self.assertRaises(ValueError):
+                Version.from_bytes(data)
+        for version in self.versions[:300]:
+            encoded = version.to_bytes()
+            for end in range(len(encoded)):
+                with self.assertRaises(ValueError, msg=encoded[:end]):
+                    Version.from_bytes(encoded[:end])
+
+    def test_bumps_increase_and_round_trip(self):
+        for part in ('major', 'minor', 'patch', 'prerelease'):
+            for version, bumped in zip(self.versions, bump_many(self.versions, part)):
+                self.assertGreater(bumped, version)
+                self.assertEqual(Version(str(bumped), strict=True), bumped)
+                self.assertEqual(Version(str(bumped)).prerelease, bumped.prerelease)
+        # A new label restarts the counter on the same core, as npm does,
+        # so the result is only guaranteed to be newer for releases.
+        for version, bumped in zip(self.versions, bump_many(self.versions, 'prerelease', 'zeta')):
+            self.assertEqual(bumped.prerelease[0], 'zeta')
+            if not version.prerelease:
+                self.assertGreater(bumped, version)
+            else:
+                self.assertEqual(bumped._core, version._core)
+
+    def test_interned_instances_are_immutable_and_picklable(self):
+        version = Version(self.strings[0])
+        self.assertIs(version, Version(self.strings[0]))
+        self.assertIs(pickle.loads(pickle.dumps(version)), version)
+        with self.assertRaises(AttributeError):
+            version.major = 99
+
+
+class CollectionDifferentialTests(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.strings = [random_semver(rng) for _ in range(SAMPLES)]
+        self.expected = sorted(self.strings, key=cmp_to_key(reference_compare))
+
+    def test_version_array_sort_unique_search(self):
+        array = VersionArray(self.strings)
+        self.assertEqual([sort_key(text) for text in array.sort()],
+                         [sort_key(text) for text in self.expected])
+        self.assertEqual([sort_key(text) for text in array.unique()],
+                         sorted({sort_key(text) for text in self.strings}))
+        ordered = array.sort()
+        versions = [Version(text) for text in ordered]
+        for probe in self.strings[:200]:
+            self.assertEqual(ordered.searchsorted(probe), bisect.bisect_left(versions, Version(probe)))
+            self.assertEqual(ordered.searchsorted(probe, 'right'), bisect.bisect_right(versions, Version(probe)))
+
+    def test_bulk_sort_matches_reference(self):
+        self.assertEqual([sort_key(text) for text in sort_versions(self.strings, workers=1, chunk_size=97)],
+                         [sort_key(text) for text in self.expected])
+
+    def test_range_filter_and_index_match_linear_scan(self):
+        versions = sorted(Version(text) for text in self.strings)
+        index = VersionIndex(versions)
+        for expression in ['^1.2', '~0.1.0', '>=1.0.0-alpha <2', '0.x || 2.x', '1.0.0 - 2.1', '>30']:
+            version_range = VersionRange(expression)
+            matching = [v for v in versions if version_range.contains(v)]
+            self.assertEqual(version_range.filter_sorted(versions), matching)
+            self.assertEqual(index.max_satisfying(version_range), max(matching, default=None))
+            self.assertEqual(index.min_satisfying(version_range), min(matching, default=None))
+            complement = ~version_range
+            self.assertTrue(all((v in complement) != (v in version_range) for v in versions))
+
+    def test_index_updates_match_sorted_list(self):
+        rng = random.Random(3)
+        index, reference = VersionIndex(), {}
+        expressions = ['^1.2', '0.x || 2.x', '>=1.0.0-alpha <2', '>30']
+        for step, text in enumerate(self.strings):
+            version = Version(text)
+            if rng.random() < 0.3 and reference:
+                victim = rng.choice(list(reference.values()))
+                self.assertTrue(index.remove(victim))
+                del reference[victim._key]
+                self.assertFalse(index.remove(victim))
+            self.assertEqual(index.add(version), version._key not in reference)
+            reference.setdefault(version._key, version)
+            if step % 50:
+                continue
+            ordered = sorted(reference.values())
+            stable = [v for v in ordered if not v.prerelease]
+            self.assertEqual(list(index), ordered)
+            self.assertEqual(index.latest_stable(), max(stable, default=None))
+            for expression in expressions:
+                version_range = VersionRange(expression)
+                self.assertEqual(index.latest_stable(expression),
+                                 max((v for v in stable if version_range.contains(v)), default=None))
+            for probe in rng.sample(self.strings, 20):
+                probe = Version(probe)
+                self.assertEqual(index.neighbors(probe),
+                                 (max((v for v in ordered if v < probe), default=None),
+                                  min((v for v in ordered if v > probe), default=None)))
+
+
+class ReleaseStoreTests(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(9)
+        self.strings = [random_semver(rng) for _ in range(SAMPLES)]
+        self.store = ReleaseStore()
+        self.addCleanup(self.store.close)
+        self.store.upsert_many(('pkg', text, None, None, {'index': index}) for index, text in enumerate(self.strings))
+        self.store.upsert('other', '1.0.0')
+        self.index = VersionIndex(self.strings)
+        self.last = {sort_key(text): index for index, text in enumerate(self.strings)}
+
+    def test_upsert_overwrites_equal_versions(self):
+        self.assertEqual(self.store.count('pkg'), len(self.index))
+        for version in list(self.index)[:300]:
+            release = self.store.get('pkg', version)
+            self.assertEqual(release.metadata, {'index': self.last[version._key]})
+            self.assertEqual(str(release.version), str(Version(self.strings[self.last[version._key]])))
+        self.store.upsert('pkg', '1.0.0+new', artifact_url='https://example.invalid/1.0.0')
+        self.assertEqual(self.store.get('pkg', '1.0.0').artifact_url, 'https://example.invalid/1.0.0')
+        self.assertEqual(self.store.get('pkg', '1.0.0').version.build_metadata, 'new')
+
+    def test_queries_match_linear_filter(self):
+        versions = list(self.index)
+        for expression in ['^1.2', '~0.1.0', '>=1.0.0-alpha <2', '0.x || 2.x', '>30', '*']:
+            version_range = VersionRange(expression)
+            self.assertEqual([release.version for release in self.store.scan('pkg', expression)],
+                             [v for v in versions if version_range.contains(v)])
+        for prefix, parts in [('1.*', (1,)), ('1.2', (1, 2)), ('1.2.*', (1, 2)), ('0.1.2', (0, 1, 2)), ('*', ())]:
+            self.assertEqual([release.version for release in self.store.prefix('pkg', prefix)],
+                             [v for v in versions if (v.major, v.minor, v.patch)[:len(parts)] == parts], prefix)
+        for lower, upper in [('1.0.0', '2.0.0'), (None, '0.5.0'), ('2.1.0-alpha', None), (None, None)]:
+            self.assertEqual([release.version for release in self.store.between('pkg', lower, upper)],
+                             [v for v in versions if (lower is None or v >= Version(lower))
+                              and (upper is None or v <= Version(upper))])
+        self.assertEqual(self.store.latest('pkg').version, versions[-1])
+        self.assertEqual([release.version for release in self.store.scan('other', '*')], [Version('1.0.0')])
+
+
+class ExternalSortTests(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        distinct = [random_semver(rng) for _ in range(SAMPLES // 4)]
+        self.strings = [rng.choice(distinct) for _ in range(SAMPLES)]
+        # About three lines per run, so the runs need more than one merge pass.
+        self.max_memory = 3 * (ENTRY_OVERHEAD + 10)
+
+    def run_sorter(self, lines, **options):
+        sorter = ExternalVersionSorter(self.max_memory, **options)
+        output = io.StringIO()
+        stats = sorter.sort(lines, output)
+        return output.getvalue().splitlines(), stats
+
+    def test_spilled_sort_matches_sorted(self):
+        for reverse in (False, True):
+            lines, stats = self.run_sorter([text + '\n' for text in self.strings], reverse=reverse)
+            self.assertGreater(stats.runs, MAX_FAN_IN)
+            self.assertEqual(lines, sorted(self.strings, key=sort_key, reverse=reverse))
+
+    def test_unique_keeps_first_occurrence(self):
+        for reverse in (False, True):
+            expected, seen = [], set()
+            for text in sorted(self.strings, key=sort_key, reverse=reverse):
+                if sort_key(text) not in seen:
+                    seen.add(sort_key(text))
+                    expected.append(text)
+            lines, _ = self.run_sorter(self.strings, unique=True, reverse=reverse)
+            self.assertEqual(lines, expected)
+
+    def test_range_and_skip_invalid(self):
+        version_range = VersionRange('>=1.0.0 <2')
+        lines, stats = self.run_sorter(self.strings + ['not a version', ''], version_range=version_range,
+                                       skip_invalid=True)
+        self.assertEqual(lines, sorted((text for text in self.strings if version_range.contains(Version(text))),
+                                       key=sort_key))
+        self.assertEqual(stats.skipped, 1)
+        with self.assertRaises(ValueError):
+            self.run_sorter(self.strings + ['not a version'])
+
+
+class ResolverServiceTests(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(11)
+        self.snapshot = {f"pkg{index}": [random_semver(rng) for _ in range(200)] for index in range(5)}
+        self.snapshot['npm-style'] = {'versions': {'1.0.0': {}, '1.1.0': {}, 'not-a-version': {}}}
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'registry.json')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump(self.snapshot, file)
+
+    def test_concurrent_requests_match_version_index(self):
+        expressions = ['^1.2', '~0.1.0', '>=1.0.0-alpha <2', '0.x || 2.x', '>30', '*']
+        queries = [(package, expression) for package in self.snapshot for expression in expressions]
+        queries += [('missing', '^1'), ('pkg0', '^')]
+
+        async def scenario():
+            service = ResolverService(Registry.from_snapshot(self.path))
+            host, port = await service.start('127.0.0.1', 0)
+            try:
+                async def client(offset):
+                    async with ResolverClient(host, port) as connection:
+                        return [await connection.resolve(queries[offset:] + queries[:offset]) for _ in range(3)]
+                responses = await asyncio.gather(*(client(offset) for offset in range(8)))
+                async with ResolverClient(host, port) as connection:
+                    stats = await connection.request('GET', '/stats')
+                    bad = await connection.request('POST', '/resolve', {'queries': 'nope'})
+                return responses, stats, bad
+            finally:
+                await service.stop()
+
+        responses, (status, stats), (bad_status, _) = asyncio.run(scenario())
+        indexes = {package: VersionIndex(Version(text) for text in versions)
+                   for package, versions in self.snapshot.items() if package != 'npm-style'}
+        indexes['npm-style'] = VersionIndex(['1.0.0', '1.1.0'])
+        for offset, results in enumerate(responses):
+            rotated = queries[offset:] + queries[:offset]
+            for result in results:
+                for (package, expression), answer in zip(rotated, result):
+                    self.assertEqual((answer['package'], answer['range']), (package, expression))
+                    if expression == '^':
+                        self.assertIn('error', answer)
+                        continue
+                    expected = indexes[package].max_satisfying(expression) if package in indexes else None
+                    self.assertEqual(answer['version'], str(expected) if expected is not None else None)
+        self.assertEqual(status, 200)
+        self.assertEqual(bad_status, 400)
+        self.assertEqual(stats['requests'], 24)
+        self.assertEqual(stats['skipped_versions'], 1)
+        self.assertLessEqual(stats['batches'], 24)
+        self.assertIsNotNone(stats['latency_ms']['p99'])
+
+    def test_failing_lookup_fails_only_its_request(self):
+        registry = Registry.from_snapshot(self.path)
+        max_satisfying = registry.max_satisfying
+
+        def lookup(package, constraint):
+            if package == 'boom':
+                raise RuntimeError('lookup crashed')
+            return max_satisfying(package, constraint)
+
+        async def scenario():
+            service = ResolverService(registry, max_delay=0.01)
+            host, port = await service.start('127.0.0.1', 0)
+            try:
+                async with ResolverClient(host, port) as first, ResolverClient(host, port) as second:
+                    failed, answered = await asyncio.gather(
+                        first.request('POST', '/resolve', {'queries': [{'package': 'boom'}]}),
+                        second.resolve([('npm-style', '*')]))
+                    after = await first.resolve([('npm-style', '^1.0')])
+                return failed, answered, after
+            finally:
+                await service.stop()
+
+        with mock.patch.object(registry, 'max_satisfying', side_effect=lookup):
+            (status, payload), answered, after = asyncio.run(asyncio.wait_for(scenario(), 10))
+        self.assertEqual((status, payload), (500, {'error': 'Resolve failed: lookup crashed'}))
+        self.assertEqual(answered[0]['version'], '1.1.0')
+        self.assertEqual(after[0]['version'], '1.1.0')
+
+
+if __name__ == '__main__':
+    unittest.main()
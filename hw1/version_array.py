@@ -0,0 +1,176 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+from hw1 import Version, _prerelease_key, _scan_version
+
+
+class VersionArray:
+    """Columnar, read-only collection of version strings.
+
+    Each row is stored as major/minor/patch in array('Q') columns, a rank into
+    a shared table of distinct prerelease keys and a (start, end) slice of a
+    shared UTF-8 buffer holding the original strings, so sorting, dedupe and
+    filtering never create per-row Version objects. Arrays derived with take(),
+    filter(), argsort() etc. share the buffer and the prerelease table.
+    """
+
+    __slots__ = ('_buffer', '_starts', '_ends', '_major', '_minor', '_patch',
+                 '_pre_rank', '_pre_keys', '_packed')
+
+    def __init__(self, versions: Iterable[str] = (), strict: bool = False):
+        buffer = bytearray()
+        starts, ends = array('Q'), array('Q')
+        major, minor, patch = array('Q'), array('Q'), array('Q')
+        pre_ids = array('I')
+        raw_prereleases: Dict[str, int] = {}
+
+        for text in versions:
+            fields = _scan_version(text, strict)
+            prerelease = fields[3]
+            pre_id = raw_prereleases.get(prerelease)
+            if pre_id is None:
+                pre_id = raw_prereleases[prerelease] = len(raw_prereleases)
+            try:
+                major.append(fields[0])
+                minor.append(fields[1])
+                patch.append(fields[2])
+            except OverflowError:
+                raise ValueError(f"Version component does not fit in 64 bits: {text!r}")
+            pre_ids.append(pre_id)
+            starts.append(len(buffer))
+            buffer += text.encode('utf-8')
+            ends.append(len(buffer))
+
+        # Rank the distinct prerelease keys once; equal keys spelled differently
+        # ('1.0.0-01' and '1.0.0-1') share a rank, releases get the highest one.
+        keys_by_id = [_prerelease_key(Version._parse_prerelease(raw)) for raw in raw_prereleases]
+        pre_keys = sorted(set(keys_by_id))
+        rank_of_key = {key: rank for rank, key in enumerate(pre_keys)}
+        remap = [rank_of_key[key] for key in keys_by_id]
+
+        self._buffer = bytes(buffer)
+        self._starts, self._ends = starts, ends
+        self._major, self._minor, self._patch = major, minor, patch
+        self._pre_rank = array('I', (remap[pre_id] for pre_id in pre_ids))
+        self._pre_keys = pre_keys
+        self._packed = None
+
+    @classmethod
+    def _from_columns(cls, source: 'VersionArray', indices: Iterable[int]) -> 'VersionArray':
+        self = object.__new__(cls)
+        self._buffer = source._buffer
+        self._pre_keys = source._pre_keys
+        self._packed = None
+        indices = indices if isinstance(indices, (array, list, range)) else list(indices)
+        for name in ('_starts', '_ends', '_major', '_minor', '_patch', '_pre_rank'):
+            column = getattr(source, name)
+            setattr(self, name, array(column.typecode, [column[i] for i in indices]))
+        return self
+
+    def __len__(self) -> int:
+        return len(self._major)
+
+    def __iter__(self) -> Iterator[str]:
+        buffer = self._buffer
+        for start, end in zip(self._starts, self._ends):
+            yield buffer[start:end].decode('utf-8')
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[str, 'VersionArray']:
+        if isinstance(item, slice):
+            return self.take(range(len(self))[item])
+        return self._buffer[self._starts[item]:self._ends[item]].decode('utf-8')
+
+    def __repr__(self):
+        preview = ', '.join(repr(v) for v in self[:5])
+        more = ', ...' if len(self) > 5 else ''
+        return f"VersionArray([{preview}{more}])"
+
+    def version(self, index: int) -> Version:
+        """Materialise row index as a Version."""
+        return Version(self[index])
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns and the string buffer."""
+        columns = (self._starts, self._ends, self._major, self._minor, self._patch, self._pre_rank)
+        return len(self._buffer) + sum(column.itemsize * len(column) for column in columns)
+
+    def _row_key(self, index: int) -> Tuple[int, int, int, int]:
+        return self._major[index], self._minor[index], self._patch[index], self._pre_rank[index]
+
+    def sort_keys(self) -> Union[array, List[int]]:
+        """One integer per row whose order equals SemVer precedence.
+
+        The columns are bit-packed into array('Q') when their widths fit in 64
+        bits, otherwise into a list of Python ints.
+        """
+        if self._packed is None:
+            minor_width, patch_width, rank_width = [
+                max(column, default=0).bit_length()
+                for column in (self._minor, self._patch, self._pre_rank)]
+            patch_shift = rank_width
+            minor_shift = patch_shift + patch_width
+            major_shift = minor_shift + minor_width
+            packed = [(major << major_shift) | (minor << minor_shift) | (patch << patch_shift) | rank
+                      for major, minor, patch, rank
+                      in zip(self._major, self._minor, self._patch, self._pre_rank)]
+            fits = max(self._major, default=0).bit_length() + major_shift <= 64
+            self._packed = array('Q', packed) if fits else packed
+        return self._packed
+
+    def argsort(self) -> array:
+        """Row indices in SemVer precedence order (stable for equal versions)."""
+        keys = self.sort_keys()
+        return array('Q', sorted(range(len(self)), key=keys.__getitem__))
+
+    def sort(self) -> 'VersionArray':
+        return self.take(self.argsort())
+
+    def unique(self) -> 'VersionArray':
+        """Sorted array keeping the first occurrence of each distinct precedence."""
+        keys = self.sort_keys()
+        order = self.argsort()
+        kept = []
+        previous = None
+        for index in order:
+            key = keys[index]
+            if key != previous:
+                kept.append(index)
+                previous = key
+        return self.take(kept)
+
+    def take(self, indices: Iterable[int]) -> 'VersionArray':
+        """New array made of the given rows, sharing this array's buffer."""
+        return VersionArray._from_columns(self, indices)
+
+    def filter(self, mask: Sequence[bool]) -> 'VersionArray':
+        """New array of the rows whose mask entry is true."""
+        if len(mask) != len(self):
+            raise ValueError(f"Mask length {len(mask)} does not match array length {len(self)}")
+        return self.take([index for index, keep in enumerate(mask) if keep])
+
+    def searchsorted(self, version: Union[Version, str], side: str = 'left') -> int:
+        """Insertion point for version in this array, which must already be sorted."""
+        if side not in ('left', 'right'):
+            raise ValueError(f"side must be 'left' or 'right', not {side!r}")
+        if not isinstance(version, Version):
+            version = Version(version)
+
+        # Place the query's prerelease between the ranks of this array; a key
+        # that does not occur here gets a half rank so it never ties.
+        pre_key = version._key[3]
+        rank = bisect_left(self._pre_keys, pre_key)
+        if rank == len(self._pre_keys) or self._pre_keys[rank] != pre_key:
+            rank -= 0.5
+        target = (version.major, version.minor, version.patch, rank)
+
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            row = self._row_key(middle)
+            if row < target or (side == 'right' and row == target):
+                low = middle + 1
+            else:
+                high = middle
+        return low
@@ -0,0 +1,93 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from hw1 import Version
+from version_range import VersionRange
+
+
+class VersionIndex:
+    """Candidate versions of one package kept sorted by SemVer precedence.
+
+    Behaves as a set under precedence: adding a version equal to one already
+    indexed (e.g. differing only in build metadata) keeps the existing entry.
+    Releases are mirrored in a second sorted list so latest_stable() does not
+    have to step over prereleases.
+    """
+
+    __slots__ = ('_versions', '_stable')
+
+    def __init__(self, versions: Iterable[Union[Version, str]] = ()):
+        unique = {}
+        for version in versions:
+            version = _as_version(version)
+            unique.setdefault(version._key, version)
+        self._versions: List[Version] = sorted(unique.values())
+        self._stable: List[Version] = [v for v in self._versions if not v.prerelease]
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def __iter__(self) -> Iterator[Version]:
+        return iter(self._versions)
+
+    def __contains__(self, version) -> bool:
+        version = _as_version(version)
+        index = bisect_left(self._versions, version)
+        return index < len(self._versions) and self._versions[index] == version
+
+    def __repr__(self):
+        return f"VersionIndex({[str(v) for v in self._versions]!r})"
+
+    def add(self, version: Union[Version, str]) -> bool:
+        """Insert version; returns False if an equal version is already indexed."""
+        version = _as_version(version)
+        if version in self:
+            return False
+        insort(self._versions, version)
+        if not version.prerelease:
+            insort(self._stable, version)
+        return True
+
+    def remove(self, version: Union[Version, str]) -> bool:
+        """Drop the indexed version equal to version; returns False if absent."""
+        version = _as_version(version)
+        index = bisect_left(self._versions, version)
+        if index == len(self._versions) or self._versions[index] != version:
+            return False
+        del self._versions[index]
+        if not version.prerelease:
+            del self._stable[bisect_left(self._stable, version)]
+        return True
+
+    def max_satisfying(self, constraint: Union[VersionRange, str]) -> Optional[Version]:
+        """Highest indexed version inside constraint, or None."""
+        slices = _as_range(constraint).slices(self._versions)
+        return self._versions[slices[-1].stop - 1] if slices else None
+
+    def min_satisfying(self, constraint: Union[VersionRange, str]) -> Optional[Version]:
+        """Lowest indexed version inside constraint, or None."""
+        slices = _as_range(constraint).slices(self._versions)
+        return self._versions[slices[0].start] if slices else None
+
+    def latest_stable(self, constraint: Union[VersionRange, str, None] = None) -> Optional[Version]:
+        """Highest release (no prerelease), optionally restricted to constraint."""
+        if constraint is None:
+            return self._stable[-1] if self._stable else None
+        slices = _as_range(constraint).slices(self._stable)
+        return self._stable[slices[-1].stop - 1] if slices else None
+
+    def neighbors(self, version: Union[Version, str]) -> Tuple[Optional[Version], Optional[Version]]:
+        """Closest indexed versions strictly below and strictly above version."""
+        version = _as_version(version)
+        below = bisect_left(self._versions, version)
+        above = bisect_right(self._versions, version)
+        return (self._versions[below - 1] if below else None,
+                self._versions[above] if above < len(self._versions) else None)
+
+
+def _as_version(version: Union[Version, str]) -> Version:
+    return version if isinstance(version, Version) else Version(version)
+
+
+def _as_range(constraint: Union[VersionRange, str]) -> VersionRange:
+    return constraint if isinstance(constraint, VersionRange) else VersionRange(constraint)
@@ -0,0 +1,317 @@
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from hw1 import Version, _format_version
+
+
+_WILDCARDS = ('x', 'X', '*')
+_OPERATORS = ('>=', '<=', '~>', '>', '<', '=', '^', '~')
+_BELOW_ALL = (-1,)
+_ABOVE_ALL = (float('inf'),)
+
+
+class Interval(NamedTuple):
+    """Versions between lower and upper; a None bound is unbounded."""
+    lower: Optional[Version]
+    lower_inclusive: bool
+    upper: Optional[Version]
+    upper_inclusive: bool
+
+    @property
+    def lower_key(self) -> Tuple:
+        return _BELOW_ALL if self.lower is None else self.lower._key
+
+    @property
+    def upper_key(self) -> Tuple:
+        return _ABOVE_ALL if self.upper is None else self.upper._key
+
+    def is_empty(self) -> bool:
+        lower, upper = self.lower_key, self.upper_key
+        return lower > upper or (lower == upper and not (self.lower_inclusive and self.upper_inclusive))
+
+    def contains_key(self, key: Tuple) -> bool:
+        lower, upper = self.lower_key, self.upper_key
+        return ((lower < key or (self.lower_inclusive and lower == key))
+                and (key < upper or (self.upper_inclusive and key == upper)))
+
+    def __str__(self):
+        if self.lower is None and self.upper is None:
+            return '*'
+        if self.lower_key == self.upper_key:
+            return _canonical(self.lower)
+        parts = []
+        if self.lower is not None:
+            parts.append(('>=' if self.lower_inclusive else '>') + _canonical(self.lower))
+        if self.upper is not None:
+            parts.append(('<=' if self.upper_inclusive else '<') + _canonical(self.upper))
+        return ' '.join(parts)
+
+
+def _canonical(version: Version) -> str:
+    return _format_version(version.major, version.minor, version.patch, version.prerelease, None)
+
+
+def _bound(major: int, minor: int, patch: int, prerelease: str = '') -> Version:
+    text = f"{major}.{minor}.{patch}"
+    return Version(f"{text}-{prerelease}" if prerelease else text)
+
+
+def _floor(major: int, minor: int = 0, patch: int = 0) -> Version:
+    # Lowest version with this core: '0' is the smallest prerelease identifier.
+    return _bound(major, minor, patch, '0')
+
+
+class VersionRange:
+    """Normalised set of disjoint version intervals parsed from a range expression.
+
+    Understands npm/cargo range syntax: comparators (>=1.2.0 <2.0.0), caret
+    (^1.4), tilde (~1.2.3, ~>1.2), X-ranges (1.x, 1.2.*, *), hyphen ranges
+    (1.2.3 - 2.3.4), whitespace or comma separated intersections and '||'
+    unions. A bare version is an exact match, as in npm.
+
+    Prereleases are ordinary points on the precedence line here; npm's rule
+    that hides prereleases of other cores is not applied.
+    """
+
+    __slots__ = ('intervals', '_lower_keys')
+
+    def __init__(self, expression: str = '*'):
+        intervals = []
+        for alternative in expression.split('||'):
+            intervals.extend(_parse_alternative(alternative.strip()).intervals)
+        self._set_intervals(intervals)
+
+    @classmethod
+    def from_intervals(cls, intervals: Iterable[Interval]) -> 'VersionRange':
+        self = object.__new__(cls)
+        self._set_intervals(intervals)
+        return self
+
+    def _set_intervals(self, intervals: Iterable[Interval]) -> None:
+        ordered = sorted((interval for interval in intervals if not interval.is_empty()),
+                         key=lambda interval: (interval.lower_key, not interval.lower_inclusive))
+        merged: List[Interval] = []
+        for interval in ordered:
+            if merged:
+                last = merged[-1]
+                last_upper, lower = last.upper_key, interval.lower_key
+                if lower < last_upper or (lower == last_upper and (last.upper_inclusive or interval.lower_inclusive)):
+                    if (interval.upper_key > last_upper
+                            or (interval.upper_key == last_upper and interval.upper_inclusive)):
+                        merged[-1] = Interval(last.lower, last.lower_inclusive,
+                                              interval.upper, interval.upper_inclusive)
+                    continue
+            merged.append(interval)
+        self.intervals: Tuple[Interval, ...] = tuple(merged)
+        self._lower_keys = [interval.lower_key for interval in merged]
+
+    def contains(self, version: Union[Version, str]) -> bool:
+        """Whether version lies in the range, found by bisecting the interval bounds."""
+        if not isinstance(version, Version):
+            version = Version(version)
+        return self.contains_key(version._key)
+
+    __contains__ = contains
+
+    def contains_key(self, key: Tuple) -> bool:
+        """contains() for a precedence key as returned by hw1.sort_key()."""
+        index = bisect_right(self._lower_keys, key) - 1
+        return index >= 0 and self.intervals[index].contains_key(key)
+
+    def slices(self, sorted_versions: Sequence) -> List[slice]:
+        """Index ranges of a precedence-sorted sequence that fall inside the range.
+
+        Accepts a sorted list of Version or a sorted VersionArray and costs two
+        binary searches per interval, independent of how many versions match.
+        """
+        result = []
+        for interval in self.intervals:
+            if interval.lower is None:
+                start = 0
+            else:
+                start = _search(sorted_versions, interval.lower, 'left' if interval.lower_inclusive else 'right')
+            if interval.upper is None:
+                stop = len(sorted_versions)
+            else:
+                stop = _search(sorted_versions, interval.upper, 'right' if interval.upper_inclusive else 'left')
+            if start < stop:
+                result.append(slice(start, stop))
+        return result
+
+    def filter_sorted(self, sorted_versions: Sequence) -> List:
+        """Items of a precedence-sorted sequence that fall inside the range, in order."""
+        matched = []
+        for part in self.slices(sorted_versions):
+            matched.extend(sorted_versions[part])
+        return matched
+
+    def intersection(self, other: 'VersionRange') -> 'VersionRange':
+        result = []
+        left, right = self.intervals, other.intervals
+        i = j = 0
+        while i < len(left) and j < len(right):
+            a, b = left[i], right[j]
+            if a.lower_key > b.lower_key or (a.lower_key == b.lower_key and not a.lower_inclusive):
+                lower, lower_inclusive = a.lower, a.lower_inclusive
+            else:
+                lower, lower_inclusive = b.lower, b.lower_inclusive
+            if a.upper_key < b.upper_key or (a.upper_key == b.upper_key and not a.upper_inclusive):
+                upper, upper_inclusive = a.upper, a.upper_inclusive
+                i += 1
+            else:
+                upper, upper_inclusive = b.upper, b.upper_inclusive
+                j += 1
+            result.append(Interval(lower, lower_inclusive, upper, upper_inclusive))
+        return VersionRange.from_intervals(result)
+
+    def union(self, other: 'VersionRange') -> 'VersionRange':
+        return VersionRange.from_intervals(self.intervals + other.intervals)
+
+    def complement(self) -> 'VersionRange':
+        result = []
+        lower, lower_inclusive = None, True
+        for interval in self.intervals:
+            if interval.lower is not None:
+                result.append(Interval(lower, lower_inclusive, interval.lower, not interval.lower_inclusive))
+            if interval.upper is None:
+                return VersionRange.from_intervals(result)
+            lower, lower_inclusive = interval.upper, not interval.upper_inclusive
+        result.append(Interval(lower, lower_inclusive, None, True))
+        return VersionRange.from_intervals(result)
+
+    __and__ = intersection
+    __or__ = union
+    __invert__ = complement
+
+    def is_empty(self) -> bool:
+        return not self.intervals
+
+    def __eq__(self, other):
+        if not isinstance(other, VersionRange):
+            return NotImplemented
+        return self._signature() == other._signature()
+
+    def __hash__(self):
+        return hash(self._signature())
+
+    def _signature(self) -> Tuple:
+        return tuple((interval.lower_key, interval.lower_inclusive, interval.upper_key, interval.upper_inclusive)
+                     for interval in self.intervals)
+
+    def __str__(self):
+        if not self.intervals:
+            return '<0.0.0-0'
+        return ' || '.join(str(interval) for interval in self.intervals)
+
+    def __repr__(self):
+        return f"VersionRange('{self}')"
+
+
+def _search(sorted_versions: Sequence, version: Version, side: str) -> int:
+    if hasattr(sorted_versions, 'searchsorted'):
+        return sorted_versions.searchsorted(version, side)
+    if side == 'left':
+        return bisect_left(sorted_versions, version)
+    return bisect_right(sorted_versions, version)
+
+
+def _parse_alternative(expression: str) -> VersionRange:
+    tokens = expression.replace(',', ' ').split()
+    if len(tokens) == 3 and tokens[1] == '-':
+        return _hyphen_range(tokens[0], tokens[2])
+
+    result = VersionRange.from_intervals([Interval(None, True, None, True)])
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        index += 1
+        if token in _OPERATORS:
+            if index == len(tokens):
+                raise ValueError(f"Missing version after {token!r} in range {expression!r}")
+            token += tokens[index]
+            index += 1
+        result = result.intersection(VersionRange.from_intervals(_comparator(token)))
+    return result
+
+
+def _partial(text: str) -> Tuple[List[Optional[int]], str]:
+    # '1.2' -> [1, 2, None], '1.x.3' -> [1, None, None], '1.2.3-rc.1' keeps the prerelease.
+    text = text.lstrip('v')
+    core, _, build = text.partition('+')
+    core, _, prerelease = core.partition('-')
+    parts: List[Optional[int]] = []
+    for part in core.split('.') if core else []:
+        if part in _WILDCARDS or parts and parts[-1] is None:
+            parts.append(None)
+        else:
+            try:
+                parts.append(int(part))
+            except ValueError:
+                raise ValueError(f"Invalid version in range: {text!r}")
+    if len(parts) > 3:
+        raise ValueError(f"Invalid version in range: {text!r}")
+    parts += [None] * (3 - len(parts))
+    if prerelease and None in parts:
+        raise ValueError(f"Prerelease requires a full version in range: {text!r}")
+    return parts, prerelease
+
+
+def _comparator(token: str) -> List[Interval]:
+    operator = ''
+    for candidate in _OPERATORS:
+        if token.startswith(candidate):
+            operator = candidate
+            break
+    (major, minor, patch), prerelease = _partial(token[len(operator):])
+
+    if major is None:
+        if operator in ('<', '>'):
+            return []
+        return [Interval(None, True, None, True)]
+
+    full = patch is not None
+    version = _bound(major, minor or 0, patch or 0, prerelease)
+    if minor is None:
+        next_up = _floor(major + 1)
+    elif patch is None:
+        next_up = _floor(major, minor + 1)
+    else:
+        next_up = None
+
+    if operator == '^':
+        if major > 0 or minor is None:
+            upper = _floor(major + 1)
+        elif minor > 0 or patch is None:
+            upper = _floor(0, minor + 1)
+        else:
+            upper = _floor(0, 0, patch + 1)
+        return [Interval(version, True, upper, False)]
+    if operator in ('~', '~>'):
+        upper = _floor(major + 1) if minor is None else _floor(major, minor + 1)
+        return [Interval(version, True, upper, False)]
+    if operator == '>=':
+        return [Interval(version, True, None, True)]
+    if operator == '>':
+        return [Interval(version, False, None, True)] if full else [Interval(next_up, True, None, True)]
+    if operator == '<':
+        return [Interval(None, True, version if full else _floor(major, minor or 0), False)]
+    if operator == '<=':
+        return [Interval(None, True, version, True)] if full else [Interval(None, True, next_up, False)]
+    if full:
+        return [Interval(version, True, version, True)]
+    return [Interval(version, True, next_up, False)]
+
+
+def _hyphen_range(low: str, high: str) -> VersionRange:
+    (major, minor, patch), prerelease = _partial(low)
+    lower = None if major is None else _bound(major, minor or 0, patch or 0, prerelease)
+    (major, minor, patch), prerelease = _partial(high)
+    if major is None:
+        upper, upper_inclusive = None, True
+    elif minor is None:
+        upper, upper_inclusive = _floor(major + 1), False
+    elif patch is None:
+        upper, upper_inclusive = _floor(major, minor + 1), False
+    else:
+        upper, upper_inclusive = _bound(major, minor, patch, prerelease), True
+    return VersionRange.from_intervals([Interval(lower, True, upper, upper_inclusive)])
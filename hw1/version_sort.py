@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+import argparse
+import heapq
+import os
+import sys
+import tempfile
+import time
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from hw1 import sort_key
+from version_range import VersionRange
+
+
+DEFAULT_MAX_MEMORY = '256M'
+MAX_FAN_IN = 64
+# Rough per-line cost of a buffered (key, line) pair on top of the line's own
+# characters: the tuple, the key tuple, its ints and the str header.
+ENTRY_OVERHEAD = 300
+UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+class SortStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.lines_read = 0
+        self.bytes_read = 0
+        self.skipped = 0
+        self.lines_written = 0
+        self.runs = 0
+
+    def report(self, stream: IO[str]) -> None:
+        elapsed = time.perf_counter() - self.started
+        rate = self.lines_read / elapsed if elapsed else 0.0
+        throughput = self.bytes_read / elapsed / 2 ** 20 if elapsed else 0.0
+        print(f"read {self.lines_read:,} lines ({self.bytes_read / 2 ** 20:,.1f} MiB), "
+              f"wrote {self.lines_written:,}, skipped {self.skipped:,}, "
+              f"spilled {self.runs} runs in {elapsed:.2f}s "
+              f"({rate:,.0f} lines/s, {throughput:,.1f} MiB/s)", file=stream)
+
+
+class ExternalVersionSorter:
+    """Sorts version strings by SemVer precedence within a memory budget.
+
+    Lines are buffered until the estimated size reaches max_memory, then the
+    sorted buffer is spilled to a temporary run file. If anything was spilled
+    the runs are k-way merged with heapq.merge, at most MAX_FAN_IN at a time.
+    Ties keep input order, so unique keeps the first occurrence.
+    """
+
+    def __init__(self, max_memory: int, version_range: Optional[VersionRange] = None,
+                 unique: bool = False, reverse: bool = False, strict: bool = False,
+                 skip_invalid: bool = False, temp_dir: Optional[str] = None):
+        self.max_memory = max_memory
+        self.version_range = version_range
+        self.unique = unique
+        self.reverse = reverse
+        self.strict = strict
+        self.skip_invalid = skip_invalid
+        self.temp_dir = temp_dir
+        self.stats = SortStats()
+
+    def _key(self, line: str) -> Tuple:
+        return sort_key(line, self.strict)
+
+    def _keyed(self, lines: Iterable[str]) -> Iterator[Tuple[Tuple, str]]:
+        stats = self.stats
+        contains = self.version_range.contains_key if self.version_range is not None else None
+        for line in lines:
+            stats.lines_read += 1
+            stats.bytes_read += len(line.encode('utf-8'))
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                key = self._key(line)
+            except ValueError:
+                if not self.skip_invalid:
+                    raise ValueError(f"Invalid version on line {stats.lines_read}: {line!r}")
+                stats.skipped += 1
+                continue
+            if contains is not None and not contains(key):
+                continue
+            yield key, line
+
+    def sort(self, lines: Iterable[str], output: IO[str]) -> SortStats:
+        with tempfile.TemporaryDirectory(prefix='version_sort_', dir=self.temp_dir) as directory:
+            runs: List[str] = []
+            buffer: List[Tuple[Tuple, str]] = []
+            used = 0
+            for entry in self._keyed(lines):
+                buffer.append(entry)
+                used += len(entry[1]) + ENTRY_OVERHEAD
+                if used >= self.max_memory:
+                    runs.append(self._spill(buffer, directory))
+                    buffer, used = [], 0
+
+            if not runs:
+                buffer.sort(key=_first, reverse=self.reverse)
+                self._write(buffer, output)
+                return self.stats
+
+            if buffer:
+                runs.append(self._spill(buffer, directory))
+            del buffer
+            # Merge in passes of adjacent groups so earlier runs stay earlier and
+            # ties keep their input order.
+            while len(runs) > MAX_FAN_IN:
+                runs = [self._merge_to_file(runs[start:start + MAX_FAN_IN], directory)
+                        for start in range(0, len(runs), MAX_FAN_IN)]
+            merged = self._merge(runs)
+            try:
+                self._write(merged, output)
+            finally:
+                merged.close()
+        return self.stats
+
+    def _spill(self, buffer: List[Tuple[Tuple, str]], directory: str) -> str:
+        buffer.sort(key=_first, reverse=self.reverse)
+        self.stats.runs += 1
+        fd, path = tempfile.mkstemp(suffix='.run', dir=directory)
+        with open(fd, 'w', encoding='utf-8') as run:
+            run.writelines(line + '\n' for _, line in buffer)
+        return path
+
+    def _merge(self, paths: List[str]) -> Iterator[Tuple[Tuple, str]]:
+        files = [open(path, 'r', encoding='utf-8') for path in paths]
+        try:
+            streams = [((self._key(line), line) for line in map(str.rstrip, run)) for run in files]
+            yield from heapq.merge(*streams, key=_first, reverse=self.reverse)
+        finally:
+            for run in files:
+                run.close()
+            for path in paths:
+                os.remove(path)
+
+    def _merge_to_file(self, paths: List[str], directory: str) -> str:
+        fd, path = tempfile.mkstemp(suffix='.run', dir=directory)
+        merged = self._merge(paths)
+        try:
+            with open(fd, 'w', encoding='utf-8') as run:
+                run.writelines(line + '\n' for _, line in merged)
+        finally:
+            merged.close()
+        return path
+
+    def _write(self, entries: Iterable[Tuple[Tuple, str]], output: IO[str]) -> None:
+        previous = None
+        written = 0
+        for key, line in entries:
+            if self.unique and key == previous:
+                continue
+            previous = key
+            output.write(line)
+            output.write('\n')
+            written += 1
+        self.stats.lines_written = written
+
+
+def _first(entry: Tuple[Tuple, str]) -> Tuple:
+    return entry[0]
+
+
+def parse_memory(value: str) -> int:
+    """Parse a size such as 512M, 2G, 64K or a plain byte count."""
+    text = value.strip().upper().rstrip('B').rstrip('I')
+    unit = text[-1:] if text[-1:] in UNITS else ''
+    number = text[:-1] if unit else text
+    try:
+        size = int(float(number) * UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid memory size: {value!r}")
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"memory size must be positive: {value!r}")
+    return size
+
+
+def read_lines(paths: List[str]) -> Iterator[str]:
+    for path in paths or ['-']:
+        if path == '-':
+            yield from sys.stdin
+        else:
+            with open(path, 'r', encoding='utf-8') as source:
+                yield from source
+
+
+def parse_arguments(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='Sort, dedupe and filter version strings by SemVer precedence',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python version_sort.py versions.txt > sorted.txt
+  cat dump-*.txt | python version_sort.py --unique --range "^1.4 || >=2.0.0 <3" --max-memory 1G --stats
+        """
+    )
+    parser.add_argument('files', nargs='*', help='Input files, one version per line (default: stdin, "-" for stdin)')
+    parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+    parser.add_argument('--range', '-r', dest='version_range', help='Keep only versions inside this range expression')
+    parser.add_argument('--unique', '-u', action='store_true', help='Drop versions equal in precedence to an earlier one')
+    parser.add_argument('--reverse', action='store_true', help='Sort from highest to lowest')
+    parser.add_argument('--strict', action='store_true', help='Only accept strict SemVer 2.0.0 versions')
+    parser.add_argument('--skip-invalid', action='store_true', help='Skip unparsable lines instead of failing')
+    parser.add_argument(
+        '--max-memory', type=parse_memory, default=DEFAULT_MAX_MEMORY,
+        help=f'Buffer size before spilling sorted runs to disk, e.g. 512M or 2G (default: {DEFAULT_MAX_MEMORY})'
+    )
+    parser.add_argument('--temp-dir', help='Directory for spilled runs (default: system temp dir)')
+    parser.add_argument('--stats', action='store_true', help='Report line counts and throughput on stderr')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point of the script."""
+    args = parse_arguments(argv)
+    try:
+        version_range = VersionRange(args.version_range) if args.version_range else None
+        sorter = ExternalVersionSorter(
+            args.max_memory, version_range, unique=args.unique, reverse=args.reverse,
+            strict=args.strict, skip_invalid=args.skip_invalid, temp_dir=args.temp_dir
+        )
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as output:
+                stats = sorter.sort(read_lines(args.files), output)
+        else:
+            stats = sorter.sort(read_lines(args.files), sys.stdout)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); exit quietly like sort(1).
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if args.stats:
+        stats.report(sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+from xml.dom import minidom
+from xml.etree.ElementTree import Element, SubElement, iterparse, tostring
+
+from reader import (CODECS, SHARDS_PER_WORKER, BinaryExporter, DataCombiner, DataLoader, ExporterFactory,
+                    IncrementalProcessor, JSONBackends, JSONExporter, RoomStudentProcessor, XMLExporter, open_file)
+
+
+FIRST_NAMES = ['Ryan', 'Brooke', 'Travis', 'Cynthia', 'Amy', 'Jose', 'Nicole', 'Kevin', 'Maria', 'David']
+LAST_NAMES = ['Keller', 'Ferrell', 'Tran', 'Smith', 'Lopez', 'Nguyen', 'Brown', 'Garcia', 'Miller', 'Young']
+
+
+def write_inputs(directory: str, students: int, rooms: int, seed: int = 0,
+                 ndjson: bool = False) -> Tuple[str, str]:
+    """Write students.json (or students.ndjson) and rooms.json shaped like the sample data, streamed to disk."""
+    rng = random.Random(seed)
+    students_file = os.path.join(directory, 'students.ndjson' if ndjson else 'students.json')
+    rooms_file = os.path.join(directory, 'rooms.json')
+    with open(students_file, 'w', encoding='utf-8') as file:
+        if not ndjson:
+            file.write('[\n')
+        for index in range(students):
+            record = {'id': index, 'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                      'room': rng.randrange(rooms)}
+            if ndjson:
+                file.write(json.dumps(record) + '\n')
+            else:
+                file.write(('    ' if index == 0 else ',\n    ') + json.dumps(record))
+        if not ndjson:
+            file.write('\n]')
+    with open(rooms_file, 'w', encoding='utf-8') as file:
+        json.dump([{'id': index, 'name': f"Room #{index}"} for index in range(rooms)], file, indent=4)
+    return students_file, rooms_file
+
+
+def generate_students(students: int, rooms: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Student records as write_inputs() writes them, generated one at a time."""
+    rng = random.Random(seed)
+    for index in range(students):
+        yield {'id': index, 'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+               'room': rng.randrange(rooms)}
+
+
+def generate_rooms(students: int, rooms: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Combined room records as combine_data() returns them, generated room by room."""
+    rng = random.Random(seed)
+    base, extra = divmod(students, rooms)
+    next_id = 0
+    for room_number in range(rooms):
+        count = base + (room_number < extra)
+        assigned = [{'id': student_id, 'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"}
+                    for student_id in range(next_id, next_id + count)]
+        next_id += count
+        yield {'room_number': room_number, 'students': assigned,
+               'room_name': f"Room #{room_number}", 'student_count': count}
+
+
+class _LegacyXMLExporter:
+    """XMLExporter as it was before streaming: ElementTree, tostring and a minidom round-trip."""
+
+    @staticmethod
+    def write(data: List[Dict[str, Any]], file) -> None:
+        root = Element('rooms')
+        for room in data:
+            room_elem = SubElement(root, 'room')
+            room_elem.set('number', str(room['room_number']))
+            SubElement(room_elem, 'room_name').text = room['room_name']
+            SubElement(room_elem, 'student_count').text = str(room['student_count'])
+            students_elem = SubElement(room_elem, 'students')
+            for student in room['students']:
+                student_elem = SubElement(students_elem, 'student')
+                student_elem.set('id', str(student['id']))
+                student_elem.text = student['name']
+        pretty_xml = minidom.parseString(tostring(root, encoding='unicode')).toprettyxml(indent='  ')
+        file.write('\n'.join([line for line in pretty_xml.split('\n') if line.strip()]))
+
+
+def _legacy_json_write(data: List[Dict[str, Any]], file) -> None:
+    """JSONExporter as it was before streaming: one json.dump of the whole list."""
+    json.dump(data, file, indent=2, ensure_ascii=False)
+
+
+# name -> (write(data, file), legacy: needs the rooms as a list and a text file)
+WRITERS = {
+    'xml-legacy': (_LegacyXMLExporter.write, True),
+    'xml': (XMLExporter().write, False),
+    'json-legacy': (_legacy_json_write, True),
+    'json': (JSONExporter('pretty').write, False),
+    'json-compact': (JSONExporter('compact').write, False),
+    'ndjson': (JSONExporter('ndjson').write, False),
+}
+
+
+def _legacy_combine(students: Iterable[Dict[str, Any]], rooms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """combine_data() as it was before bucketed grouping: a dict per student and a sort of the room records."""
+    students_by_room = defaultdict(list)
+    for student in students:
+        students_by_room[student['room']].append({'id': student['id'], 'name': student['name']})
+    combined_data = [{'room_number': room_number, 'students': assigned_students,
+                      'room_name': f"Room #{room_number}", 'student_count': len(assigned_students)}
+                     for room_number, assigned_students in students_by_room.items()]
+    combined_data.sort(key=lambda x: x['room_number'])
+    return combined_data
+
+
+# name -> combine(students, rooms): rooms with their students, in room order
+GROUPINGS = {
+    'generate-only': lambda students, rooms: [{'student_count': sum(1 for _ in students)}],
+    'legacy': _legacy_combine,
+    'dict': lambda students, rooms: DataCombiner.join(DataCombiner.group_students(students),
+                                                      DataCombiner.index_rooms(rooms)),
+    'buckets': DataCombiner.iter_rooms,
+}
+
+
+def measure(label: str, func: Callable[[], object]) -> Tuple[float, int]:
+    """Run func once under tracemalloc and print its time and peak traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<40} {elapsed:8.3f}s  peak {peak / 2 ** 20:10,.1f} MiB")
+    return elapsed, peak
+
+
+def bench_load(args) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        students_file, rooms_file = write_inputs(directory, args.students, args.rooms, args.seed)
+        print(f"{args.students:,} students in {args.rooms:,} rooms "
+              f"({os.path.getsize(students_file) / 2 ** 20:,.1f} MiB)")
+        rooms = DataLoader.load_json(rooms_file)
+        measure('load_json + combine_data',
+                lambda: DataCombiner.combine_data(DataLoader.load_json(students_file), rooms))
+        measure('iter_json + combine_data',
+                lambda: DataCombiner.combine_data(DataLoader.iter_json(students_file), rooms))
+        measure('iter_json only (count records)',
+                lambda: sum(1 for _ in DataLoader.iter_json(students_file)))
+
+
+def run_writer(args) -> None:
+    """Child process body for the export benchmarks: export once, report time and peak RSS as JSON."""
+    write, legacy = WRITERS[args.writer]
+    data = generate_rooms(args.students, args.rooms, args.seed)
+    if legacy:
+        data = list(data)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    with open(args.output, 'w', encoding='utf-8') if legacy else open(args.output, 'wb') as file:
+        write(data, file)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'seconds': elapsed, 'peak_kib': peak, 'baseline_kib': baseline}))
+
+
+def compare_writers(args, writers: List[str], legacy: str) -> None:
+    """Run each writer in a fresh process per size; the legacy writer is the reference output."""
+    with tempfile.TemporaryDirectory() as directory:
+        for students in args.sizes:
+            print(f"{students:,} students in {args.rooms:,} rooms")
+            outputs = {}
+            for writer in writers:
+                if writer == legacy and students > args.legacy_limit:
+                    print(f"  {writer:<14} skipped (over --legacy-limit {args.legacy_limit:,})")
+                    continue
+                outputs[writer] = os.path.join(directory, writer)
+                result = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--students', str(students), '--rooms', str(args.rooms),
+                     '--seed', str(args.seed), 'export-run', writer, outputs[writer]],
+                    check=True, capture_output=True, text=True
+                )
+                stats = json.loads(result.stdout)
+                print(f"  {writer:<14} {stats['seconds']:8.3f}s  peak RSS {stats['peak_kib'] / 1024:9,.1f} MiB  "
+                      f"(data {stats['baseline_kib'] / 1024:,.1f} MiB, output "
+                      f"{os.path.getsize(outputs[writer]) / 2 ** 20:,.1f} MiB)")
+            if legacy in outputs and writers[1] in outputs:
+                with open(outputs[legacy], 'rb') as before, open(outputs[writers[1]], 'rb') as after:
+                    print(f"  {writers[1]} identical to {legacy}: {before.read() == after.read()}")
+
+
+def bench_xml(args) -> None:
+    compare_writers(args, ['xml-legacy', 'xml'], 'xml-legacy')
+
+
+def bench_json(args) -> None:
+    compare_writers(args, ['json-legacy', 'json', 'json-compact', 'ndjson'], 'json-legacy')
+
+
+def bench_workers(args) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        students_file, _ = write_inputs(directory, args.students, args.rooms, args.seed, ndjson=True)
+        print(f"{args.students:,} students in {args.rooms:,} rooms "
+              f"({os.path.getsize(students_file) / 2 ** 20:,.1f} MiB NDJSON), {os.cpu_count()} CPUs")
+        start = time.perf_counter()
+        expected = DataCombiner.group_students(DataLoader.iter_json(students_file))
+        serial = time.perf_counter() - start
+        print(f"{'serial group_students':<28} {serial:8.3f}s")
+        for workers in args.workers:
+            processor = RoomStudentProcessor(workers)
+            start = time.perf_counter()
+            groups = processor.group_parallel([students_file])
+            elapsed = time.perf_counter() - start
+            shards = len(DataLoader.shards([students_file], workers * SHARDS_PER_WORKER))
+            print(f"{f'workers={workers} ({shards} shards)':<28} {elapsed:8.3f}s  speedup {serial / elapsed:5.2f}x  "
+                  f"identical: {groups == expected}")
+
+
+def run_grouping(args) -> None:
+    """Child process body for bench group: combine generated students once, report time and peak RSS as JSON."""
+    rooms = [{'id': index, 'name': f"Room #{index}"} for index in range(args.rooms)]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    count = sum(room['student_count'] for room in GROUPINGS[args.grouping](
+        generate_students(args.students, args.rooms, args.seed), rooms))
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'seconds': elapsed, 'peak_kib': peak, 'baseline_kib': baseline, 'students': count}))
+
+
+def bench_group(args) -> None:
+    print(f"{args.students:,} students in {args.rooms:,} rooms, generated while grouping")
+    for grouping in GROUPINGS:
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--students', str(args.students), '--rooms', str(args.rooms),
+             '--seed', str(args.seed), 'group-run', grouping],
+            check=True, capture_output=True, text=True
+        )
+        stats = json.loads(result.stdout)
+        assert stats['students'] == args.students, (grouping, stats['students'])
+        print(f"  {grouping:<14} {stats['seconds']:8.3f}s  peak RSS {stats['peak_kib'] / 1024:9,.1f} MiB")
+
+
+def _read_xml(path: str) -> int:
+    count = 0
+    for _, element in iterparse(path):
+        if element.tag == 'student':
+            count += 1
+        elif element.tag == 'room':
+            element.clear()
+    return count
+
+
+def _read_json(path: str) -> int:
+    with open(path, 'r', encoding='utf-8') as file:
+        return sum(len(room['students']) for room in json.load(file))
+
+
+def _read_ndjson(path: str) -> int:
+    with open(path, 'r', encoding='utf-8') as file:
+        return sum(len(json.loads(line)['students']) for line in file)
+
+
+def _read_csv(path: str) -> int:
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        return sum(1 for _ in csv.reader(file)) - 1
+
+
+def _read_parquet(path: str) -> int:
+    import pyarrow.parquet as pq
+    return pq.read_table(path).num_rows
+
+
+# format -> read the exported file back into Python (Arrow for Parquet) and count the students
+READERS = {
+    'json': _read_json,
+    'ndjson': _read_ndjson,
+    'xml': _read_xml,
+    'csv': _read_csv,
+    'bin': lambda path: sum(len(room['students']) for room in BinaryExporter.read(path)),
+    'parquet': _read_parquet,
+}
+
+
+def bench_formats(args) -> None:
+    print(f"{args.students:,} students in {args.rooms:,} rooms")
+    with tempfile.TemporaryDirectory() as directory:
+        for output_format in ExporterFactory.formats():
+            exporter = ExporterFactory.create_exporter(output_format)
+            path = os.path.join(directory, f"output.{output_format}")
+            rooms = list(generate_rooms(args.students, args.rooms, args.seed))
+            start = time.perf_counter()
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                exporter.export(rooms, path)
+            written = time.perf_counter() - start
+            start = time.perf_counter()
+            count = READERS[output_format](path)
+            read = time.perf_counter() - start
+            assert count == args.students, (output_format, count)
+            print(f"  {output_format:<8} write {written:7.3f}s  read {read:7.3f}s  "
+                  f"size {os.path.getsize(path) / 2 ** 20:8.1f} MiB")
+
+
+def bench_codecs(args) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        students_file, rooms_file = write_inputs(directory, args.students, args.rooms, args.seed)
+        print(f"{args.students:,} students in {args.rooms:,} rooms, {args.format} output, "
+              f"input and output through each codec")
+        for suffix in [''] + list(CODECS):
+            compressed = students_file + suffix
+            if suffix:
+                with open(students_file, 'rb') as source, open_file(compressed, 'wb') as target:
+                    shutil.copyfileobj(source, target)
+            output_file = os.path.join(directory, f"output.{args.format}{suffix}")
+            start = time.perf_counter()
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                RoomStudentProcessor().process(compressed, rooms_file, output_file, args.format)
+            elapsed = time.perf_counter() - start
+            print(f"  {suffix or 'none':<6} {elapsed:8.3f}s  input {os.path.getsize(compressed) / 2 ** 20:8.1f} MiB  "
+                  f"output {os.path.getsize(output_file) / 2 ** 20:8.1f} MiB")
+
+
+def bench_backends(args) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        array_file, _ = write_inputs(directory, args.students, args.rooms, args.seed)
+        ndjson_file, _ = write_inputs(directory, args.students, args.rooms, args.seed, ndjson=True)
+        print(f"{args.students:,} students in {args.rooms:,} rooms; installed backends: "
+              f"{', '.join(JSONBackends.available())}")
+        probe = ('import sys, time; start = time.perf_counter(); import reader; '
+                 'print((time.perf_counter() - start) * 1000, sorted(set(sys.modules) & {names!r}))')
+        result = subprocess.run([sys.executable, '-c', probe.format(names=set(JSONBackends.names()) - {'json'})],
+                                check=True, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        elapsed, imported = result.stdout.split(' ', 1)
+        print(f"  import reader {float(elapsed):6.1f} ms, backends imported: {imported.strip()}")
+        for label, path in (('JSON array', array_file), ('NDJSON', ndjson_file)):
+            expected = None
+            for backend in [None] + JSONBackends.available():
+                start = time.perf_counter()
+                groups = DataCombiner.group_students(DataLoader.iter_json(path, backend=backend))
+                elapsed = time.perf_counter() - start
+                expected = groups if expected is None else expected
+                print(f"  {label:<10} {backend or 'stream':<8} {elapsed:8.3f}s  identical: {groups == expected}")
+
+
+def bench_incremental(args) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        students_file, rooms_file = write_inputs(directory, args.students, args.rooms, args.seed, ndjson=True)
+        output_file = os.path.join(directory, f"output.{args.format}")
+        print(f"{args.students:,} students in {args.rooms:,} rooms, {args.format} output, "
+              f"{args.moves} students moved between runs")
+
+        def run(label: str, processor: RoomStudentProcessor) -> None:
+            start = time.perf_counter()
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                processor.process(students_file, rooms_file, output_file, args.format)
+            print(f"  {label:<36} {time.perf_counter() - start:8.3f}s")
+
+        run('full run', RoomStudentProcessor())
+        run('incremental, no checkpoint yet', IncrementalProcessor())
+        run('incremental, inputs unchanged', IncrementalProcessor())
+        rng = random.Random(args.seed)
+        with open(students_file, 'r', encoding='utf-8') as file:
+            lines = file.readlines()
+        for index in rng.sample(range(len(lines)), args.moves):
+            record = json.loads(lines[index])
+            record['room'] = rng.randrange(args.rooms)
+            lines[index] = json.dumps(record) + '\n'
+        with open(students_file, 'w', encoding='utf-8') as file:
+            file.writelines(lines)
+        run(f'incremental, {args.moves} moved', IncrementalProcessor())
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmarks for the room-student pipeline')
+    parser.add_argument('--students', type=int, default=1_000_000, help='Students to generate (default: 1000000)')
+    parser.add_argument('--rooms', type=int, default=1000, help='Rooms to generate (default: 1000)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    subparsers.add_parser('load', help='json.load versus incremental loading').set_defaults(func=bench_load)
+    for name, func, help_text in (('xml', bench_xml, 'minidom round-trip versus streaming XML export'),
+                                  ('json', bench_json, 'json.dump versus streaming JSON/compact/NDJSON export')):
+        export = subparsers.add_parser(name, help=f'{help_text}, time and peak RSS')
+        export.add_argument('--sizes', type=int, nargs='+', default=[10_000, 10_000_000],
+                            help='Student counts to export (default: 10000 10000000)')
+        export.add_argument('--legacy-limit', type=int, default=1_000_000,
+                            help='Largest size run through the old exporter (default: 1000000)')
+        export.set_defaults(func=func)
+    workers = subparsers.add_parser('workers', help='Sharded process-pool grouping across worker counts')
+    workers.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8],
+                         help='Worker counts (default: 1 2 4 8)')
+    workers.set_defaults(func=bench_workers)
+    subparsers.add_parser('formats', help='Write and read-back time and size of every registered output format'
+                          ).set_defaults(func=bench_formats)
+    subparsers.add_parser('group', help='Dict-per-student grouping versus (id, name) tuples in dict or room buckets, '
+                          'time and peak RSS').set_defaults(func=bench_group)
+    subparsers.add_parser('backends', help='Streaming json versus memory-mapped decoding with each installed '
+                          'JSON backend').set_defaults(func=bench_backends)
+    codecs = subparsers.add_parser('codecs', help='End-to-end time and file sizes per compression codec')
+    codecs.add_argument('--format', default='json', help='Output format (default: json)')
+    codecs.set_defaults(func=bench_codecs)
+    incremental = subparsers.add_parser('incremental', help='Full run versus --incremental re-runs')
+    incremental.add_argument('--format', default='json', help='Output format (default: json)')
+    incremental.add_argument('--moves', type=int, default=100, help='Students moved between runs (default: 100)')
+    incremental.set_defaults(func=bench_incremental)
+    export_run = subparsers.add_parser('export-run')
+    export_run.add_argument('writer', choices=sorted(WRITERS))
+    export_run.add_argument('output')
+    export_run.set_defaults(func=run_writer)
+    group_run = subparsers.add_parser('group-run')
+    group_run.add_argument('grouping', choices=list(GROUPINGS))
+    group_run.set_defaults(func=run_grouping)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
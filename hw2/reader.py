@@ -1,149 +1,1074 @@
 #!/usr/bin/env python3
 
+import bz2
+import csv
+import gzip
+import hashlib
+import heapq
+import importlib.util
+import io
 import json
+import lzma
+import marshal
+import mmap
 import argparse
+import os
+import re
+import struct
 import sys
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import List, Dict, Any
-from xml.etree.ElementTree import Element, SubElement, tostring
-from xml.dom import minidom
+from typing import IO, List, Dict, Any, BinaryIO, Callable, Iterable, Iterator, Optional, TextIO, Tuple, Union
+from xml.sax.saxutils import escape
+
+
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+CHUNK_SIZE = 1 << 16
+NON_SPACE = re.compile(r'\S')
+DELIMITERS = frozenset(', \t\r\n]')
+XML_ENTITIES = {'"': '&quot;'}
+MIN_SHARD_BYTES = 1 << 20
+CSV_HEADER = ['room_number', 'room_name', 'student_count', 'student_id', 'student_name']
+PARQUET_ROW_GROUP = 1 << 16
+CHECKPOINT_SUFFIX = '.checkpoint'
+CHECKPOINT_VERSION = 1
+SHARDS_PER_WORKER = 4
+MAX_REPORTED_ROOMS = 10
+DEFAULT_TOP_ROOMS = 10
+DEFAULT_BIN_WIDTH = 5
+
+# Level 6 is zlib's default: gzip.open's 9 takes 4x as long for ~5% smaller output.
+GZIP_LEVEL = 6
+# suffix -> open(filepath, mode, encoding=...) streaming through the codec
+CODECS: Dict[str, Callable[..., IO]] = {
+    '.gz': partial(gzip.open, compresslevel=GZIP_LEVEL),
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+ZSTD_SUFFIX = '.zst'
+COMPRESSION_SUFFIXES = tuple(CODECS) + (ZSTD_SUFFIX,)
+
+
+def _open_zstd(filepath: str, mode: str, encoding: Optional[str] = None) -> IO:
+    # Imported here: zstd is in the standard library only from Python 3.14.
+    try:
+        from compression import zstd
+    except ImportError:
+        import zstandard
+    else:
+        return zstd.open(filepath, mode, encoding=encoding)
+    if 'r' not in mode:
+        return zstandard.open(filepath, mode, encoding=encoding)
+    # zstandard's reader has no readline(): buffer it, like the other codecs' files.
+    file = io.BufferedReader(zstandard.open(filepath, 'rb'))
+    return file if encoding is None else io.TextIOWrapper(file, encoding=encoding)
+
+
+if sys.version_info >= (3, 14) or importlib.util.find_spec('zstandard') is not None:
+    CODECS[ZSTD_SUFFIX] = _open_zstd
+
+
+def compression_suffix(filepath: str) -> Optional[str]:
+    """The compression suffix filepath ends with ('.gz', '.bz2', '.xz', '.zst'), or None."""
+    return next((suffix for suffix in COMPRESSION_SUFFIXES if filepath.endswith(suffix)), None)
+
+
+def _strip_compression(filepath: str) -> str:
+    suffix = compression_suffix(filepath)
+    return filepath[:-len(suffix)] if suffix else filepath
+
+
+def open_file(filepath: str, mode: str = 'rb', name: Optional[str] = None) -> IO:
+    """Open filepath, compressed or decompressed on the fly when its name ends with a codec suffix.
+
+    name, when given, is the file name the codec is picked from (for
+    temporary files). Text modes use UTF-8. Codecs work on a stream, so a
+    compressed file is never expanded on disk or in memory as a whole.
+    """
+    suffix = compression_suffix(name or filepath)
+    encoding = None if 'b' in mode else 'utf-8'
+    if suffix is None:
+        return open(filepath, mode, encoding=encoding)
+    if suffix not in CODECS:
+        raise ValueError(f"Cannot open {filepath}: {suffix} files need Python 3.14 or the zstandard package")
+    return CODECS[suffix](filepath, mode if encoding is None else mode + 't', encoding=encoding)
+
+
+class JSONBackends:
+    """JSON decoders by name, each imported on first use so startup only pays for the one picked."""
+
+    # name -> (module, factory(module) returning decode(data) for bytes and memoryviews)
+    _backends: Dict[str, Tuple[str, Callable[[Any], Callable[[Any], Any]]]] = {}
+    _decoders: Dict[str, Callable[[Any], Any]] = {}
+
+    @classmethod
+    def register(cls, name: str, module: str, factory: Callable[[Any], Callable[[Any], Any]]) -> None:
+        """Make factory(imported module) the backend called name; 'auto' prefers earlier registrations.
+
+        The decoder must raise ValueError (or a subclass) on invalid input:
+        the loaders report that as invalid JSON in the file.
+        """
+        cls._backends[name] = (module, factory)
+        cls._decoders.pop(name, None)
+
+    @classmethod
+    def names(cls) -> List[str]:
+        """Names of the registered backends, installed or not."""
+        return list(cls._backends)
+
+    @classmethod
+    def available(cls) -> List[str]:
+        """Registered backends whose module is installed, in preference order."""
+        return [name for name, (module, _) in cls._backends.items()
+                if importlib.util.find_spec(module.partition('.')[0]) is not None]
+
+    @classmethod
+    def decoder(cls, name: str = 'auto') -> Callable[[Any], Any]:
+        """decode(data) for the backend called name; data is bytes or a memoryview."""
+        if name == 'auto':
+            name = cls.available()[0]
+        if name not in cls._decoders:
+            if name not in cls._backends:
+                raise ValueError(f"Unsupported JSON backend: {name}")
+            module, factory = cls._backends[name]
+            try:
+                cls._decoders[name] = factory(importlib.import_module(module))
+            except ImportError:
+                raise ValueError(f"JSON backend {name} is not installed")
+        return cls._decoders[name]
+
+
+def _decode_bytes(decode: Callable[[bytes], Any], data: Any) -> Any:
+    return decode(data if isinstance(data, bytes) else bytes(data))
+
+
+def _decode_text(decode: Callable[[str], Any], data: Any) -> Any:
+    # json.loads() on bytes sniffs the encoding on every call, a third of the time for one NDJSON line.
+    return decode(str(data, 'utf-8'))
+
+
+# orjson.JSONDecodeError, msgspec.DecodeError and ujson.JSONDecodeError all
+# subclass ValueError, so every decoder here raises what the loaders catch.
+JSONBackends.register('orjson', 'orjson', lambda orjson: orjson.loads)
+JSONBackends.register('msgspec', 'msgspec.json', lambda msgspec_json: msgspec_json.decode)
+JSONBackends.register('ujson', 'ujson', lambda ujson: partial(_decode_bytes, ujson.loads))
+JSONBackends.register('json', 'json', lambda json_module: partial(_decode_text, json_module.JSONDecoder().decode))
+
+
+StudentRecord = Tuple[Any, Any]
+# (path, start byte, end byte); end None means the whole file
+Shard = Tuple[str, int, Optional[int]]
 
 
 class DataLoader:    
     @staticmethod
-    def load_json(filepath: str) -> List[Dict[str, Any]]:
-        """Load JSON data from file."""
+    def load_json(filepath: str, backend: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Load JSON data from file; with backend, decode a memory map of it with that JSONBackends entry."""
+        decode = None if backend is None else JSONBackends.decoder(backend)
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
+            if decode is not None:
+                with DataLoader.map_file(filepath) as data:
+                    if isinstance(data, mmap.mmap):
+                        with memoryview(data) as view:
+                            return decode(view)
+                    return decode(data.read())
+            with open_file(filepath, 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {filepath}")
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON in file {filepath}: {e}")
+
+    @staticmethod
+    @contextmanager
+    def map_file(filepath: str) -> Iterator[Union[mmap.mmap, BinaryIO]]:
+        """A read-only memory map of filepath; a binary stream for compressed or empty files,
+        which cannot be mapped. Both have read() and readline()."""
+        if compression_suffix(filepath):
+            with open_file(filepath, 'rb') as f:
+                yield f
+            return
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield f
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    @staticmethod
+    def iter_json(filepath: str, chunk_size: int = CHUNK_SIZE, backend: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield records one at a time from a top-level JSON array or NDJSON file.
+
+        With backend, the file is memory-mapped and decoded by that
+        JSONBackends entry: NDJSON line by line, a JSON array all at once.
+        """
+        if backend is not None:
+            yield from DataLoader._iter_mapped(filepath, backend)
+            return
+        try:
+            with open_file(filepath, 'r') as f:
+                # The text read to find the first character is handed on rather
+                # than re-read: decompressing streams cannot always seek back.
+                head, match = '', None
+                while match is None:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        return
+                    match = NON_SPACE.search(chunk)
+                    head += chunk
+                if match.group() == '[' and not _strip_compression(filepath).endswith(NDJSON_SUFFIXES):
+                    yield from DataLoader._iter_array(f, chunk_size, head)
+                else:
+                    yield from DataLoader._iter_lines(f, filepath, head)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {filepath}")
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in file {filepath}: {e}")
 
+    @staticmethod
+    def is_ndjson(filepath: str) -> bool:
+        """True for .ndjson/.jsonl files (compressed or not) and for any file not starting with '['."""
+        if _strip_compression(filepath).endswith(NDJSON_SUFFIXES):
+            return True
+        with open_file(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                stripped = chunk.lstrip()
+                if stripped:
+                    return stripped[:1] != b'['
+        return True
+
+    @staticmethod
+    def shards(filepaths: List[str], count: int) -> List[Shard]:
+        """Split input files into about count shards, in input order.
+
+        JSON array and compressed files are one shard each; NDJSON files are
+        cut into byte ranges of at least MIN_SHARD_BYTES, which iter_shard()
+        aligns to lines.
+        """
+        sizes = {path: os.path.getsize(path) for path in filepaths}
+        target = max(MIN_SHARD_BYTES, -(-sum(sizes.values()) // max(count, 1)))
+        shards: List[Shard] = []
+        for path in filepaths:
+            if compression_suffix(path) or not DataLoader.is_ndjson(path) or sizes[path] <= target:
+                shards.append((path, 0, None))
+                continue
+            for start in range(0, sizes[path], target):
+                shards.append((path, start, min(start + target, sizes[path])))
+        return shards
+
+    @staticmethod
+    def iter_shard(shard: Shard, backend: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield the records of one shard: a whole file, or the NDJSON lines starting in [start, end)."""
+        filepath, start, end = shard
+        if end is None:
+            yield from DataLoader.iter_json(filepath, backend=backend)
+            return
+        decode = json.loads if backend is None else JSONBackends.decoder(backend)
+        with open(filepath, 'rb') as f:
+            if start:
+                # The line holding byte start - 1 belongs to the previous shard.
+                f.seek(start - 1)
+                f.readline()
+            position = f.tell()
+            while position < end:
+                line = f.readline()
+                if not line:
+                    break
+                if line.strip():
+                    try:
+                        yield decode(line)
+                    except ValueError as e:
+                        raise ValueError(f"Invalid JSON at byte {position} of {filepath}: {e}")
+                position += len(line)
+
+    @staticmethod
+    def _iter_array(f: TextIO, chunk_size: int, head: str = '') -> Iterator[Any]:
+        """Decode the elements of a top-level JSON array chunk by chunk; head is text already read from f."""
+        decoder = json.JSONDecoder()
+        buffer, pos = head, 0
+        eof = False
+        expecting = 'open'
+        while True:
+            match = NON_SPACE.search(buffer, pos)
+            if match is None:
+                buffer, pos = f.read(chunk_size), 0
+                if not buffer:
+                    raise json.JSONDecodeError("Unterminated array", '', 0)
+                continue
+            pos = match.start()
+            if expecting == 'open':
+                if buffer[pos] != '[':
+                    raise json.JSONDecodeError("Expecting '['", buffer, pos)
+                pos += 1
+                expecting = 'first'
+                continue
+            if buffer[pos] == ']' and expecting != 'value':
+                # Like json.load(), only whitespace may follow the array.
+                rest = buffer[pos + 1:]
+                while True:
+                    match = NON_SPACE.search(rest)
+                    if match is not None:
+                        raise json.JSONDecodeError("Extra data", rest, match.start())
+                    if eof:
+                        return
+                    rest = f.read(chunk_size)
+                    eof = not rest
+            if expecting == 'separator':
+                if buffer[pos] != ',':
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                pos += 1
+                expecting = 'value'
+                continue
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    end = None
+                # A value not followed by a delimiter may be cut off by the chunk
+                # boundary ("23." of "23.5"), so it is decoded again with more
+                # input. Reads grow with the value to stay linear.
+                if end is not None and (eof or buffer[end:end + 1] in DELIMITERS):
+                    break
+                chunk = f.read(max(chunk_size, len(buffer) - pos))
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+            yield record
+            pos = end
+            expecting = 'separator'
+
+    @staticmethod
+    def _iter_mapped(filepath: str, backend: str) -> Iterator[Any]:
+        if not DataLoader.is_ndjson(filepath):
+            records = DataLoader.load_json(filepath, backend)
+            if not isinstance(records, list):
+                raise ValueError(f"Invalid JSON in file {filepath}: expecting a top-level array")
+            yield from records
+            return
+        decode = JSONBackends.decoder(backend)
+        with DataLoader.map_file(filepath) as data:
+            for number, line in enumerate(iter(data.readline, b''), 1):
+                if line.strip():
+                    try:
+                        yield decode(line)
+                    except ValueError as e:
+                        raise ValueError(f"Invalid JSON on line {number} of {filepath}: {e}")
+
+    @staticmethod
+    def _iter_lines(f: TextIO, filepath: str, head: str = '') -> Iterator[Any]:
+        """Decode one JSON value per non-blank line; head is text already read from f."""
+        lines = chain(io.StringIO(head + f.readline()), f) if head else f
+        for number, line in enumerate(lines, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {number} of {filepath}: {e}")
+
 
 class DataCombiner:    
     @staticmethod
-    def combine_data(students: List[Dict[str, Any]], rooms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def combine_data(students: Iterable[Dict[str, Any]], rooms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Combine students and rooms data into a structured format."""
+        return list(DataCombiner.iter_rooms(students, rooms))
+
+    @staticmethod
+    def iter_rooms(students: Iterable[Dict[str, Any]], rooms: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield combined rooms in room order, building each one only when it is consumed."""
+        room_names = DataCombiner.index_rooms(rooms)
+        room_count = DataCombiner.dense_room_count(room_names)
+        return DataCombiner.join(DataCombiner.group_students(students, room_count), room_names, room_count)
+
+    @staticmethod
+    def join(students_by_room: Dict[Any, List[StudentRecord]], room_names: Dict[Any, str],
+             room_count: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Hash-join grouped students with the room index: every room is yielded, empty ones
+        included, under its own name; students of unknown rooms are reported and left out.
+        room_count is dense_room_count(room_names), when known."""
+        orphans = DataCombiner.pop_orphans(students_by_room, room_names)
+        if orphans:
+            count = sum(map(len, orphans.values()))
+            unknown = list(orphans)
+            listed = ', '.join(map(str, unknown[:MAX_REPORTED_ROOMS]))
+            if len(unknown) > MAX_REPORTED_ROOMS:
+                listed += ', ...'
+            print(f"Warning: {count} students assigned to {len(unknown)} unknown rooms ({listed}) were left out")
+        return DataCombiner.rooms_from_groups(students_by_room, room_names, room_count)
+
+    @staticmethod
+    def index_rooms(rooms: List[Dict[str, Any]]) -> Dict[Any, str]:
+        """Map room id to room name."""
+        room_names = {room['id']: room['name'] for room in rooms}
+        if len(room_names) != len(rooms):
+            duplicates = [room_id for room_id, count in Counter(room['id'] for room in rooms).items() if count > 1]
+            raise ValueError(f"Duplicate room ids in rooms data: {', '.join(map(str, duplicates))}")
+        return room_names
+
+    @staticmethod
+    def pop_orphans(students_by_room: Dict[Any, List[StudentRecord]],
+                    room_names: Dict[Any, str]) -> Dict[Any, List[StudentRecord]]:
+        """Remove and return the groups whose room is not in room_names."""
+        unknown = [room_number for room_number in students_by_room if room_number not in room_names]
+        return {room_number: students_by_room.pop(room_number) for room_number in unknown}
+
+    @staticmethod
+    def dense_room_count(room_names: Dict[Any, str]) -> Optional[int]:
+        """len(room_names) if the room ids are exactly 0..len - 1, else None."""
+        count = len(room_names)
+        if all(type(room_number) is int and 0 <= room_number < count for room_number in room_names):
+            return count
+        return None
+
+    @staticmethod
+    def group_students(students: Iterable[Dict[str, Any]],
+                       room_count: Optional[int] = None) -> Dict[Any, List[StudentRecord]]:
+        """Group students by room number as (id, name) tuples, keeping input order within each room.
+
+        With room_count, rooms 0..room_count - 1 are list buckets indexed by
+        room number; any other room number goes to the dict used when
+        room_count is None.
+        """
         students_by_room = defaultdict(list)
-        
+        if room_count is None:
+            for student in students:
+                students_by_room[student['room']].append((student['id'], student['name']))
+            return students_by_room
+
+        buckets = [[] for _ in range(room_count)]
         for student in students:
             room_number = student['room']
-            students_by_room[room_number].append({
-                'id': student['id'],
-                'name': student['name']
-            })
-
-        combined_data = []
-        
+            if isinstance(room_number, int) and 0 <= room_number < room_count:
+                buckets[room_number].append((student['id'], student['name']))
+            else:
+                students_by_room[room_number].append((student['id'], student['name']))
+        grouped = defaultdict(list, zip(range(room_count), buckets))
         for room_number, assigned_students in students_by_room.items():
-            room_data = {
+            grouped[room_number].extend(assigned_students)
+        return grouped
+
+    @staticmethod
+    def merge_groups(groups: Iterable[Dict[Any, List[StudentRecord]]]) -> Dict[Any, List[StudentRecord]]:
+        """Merge partial groupings given in input order into one, as if grouped in a single pass."""
+        merged = defaultdict(list)
+        for group in groups:
+            for room_number, assigned_students in group.items():
+                merged[room_number].extend(assigned_students)
+        return merged
+
+    @staticmethod
+    def rooms_from_groups(students_by_room: Dict[Any, List[StudentRecord]], room_names: Optional[Dict[Any, str]] = None,
+                          room_count: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield room records in room order, releasing each group as it is yielded.
+
+        Student dicts are built here, one room at a time, so only the grouped
+        tuples are held for every student.
+
+        With room_names, every room in it is yielded (empty ones too) and
+        groups of other rooms are skipped; without, one room per group,
+        named after its number. With room_count, the room ids are known to be
+        0..room_count - 1 and are yielded in index order, without a sort.
+        """
+        if room_names is None:
+            room_names = {room_number: f"Room #{room_number}" for room_number in students_by_room}
+        for room_number in range(room_count) if room_count is not None else sorted(room_names):
+            assigned_students = [{'id': student_id, 'name': name}
+                                 for student_id, name in students_by_room.pop(room_number, ())]
+            yield {
                 'room_number': room_number,
                 'students': assigned_students,
-                'room_name': f"Room #{room_number}",
+                'room_name': room_names[room_number],
                 'student_count': len(assigned_students)
             }
-            combined_data.append(room_data)
-
-        combined_data.sort(key=lambda x: x['room_number'])
-        return combined_data
 
 
 class DataExporter(ABC):    
+    def __init__(self, compact: bool = False):
+        self.compact = compact
+
     @abstractmethod
-    def export(self, data: List[Dict[str, Any]], output_file: str) -> None:
+    def export(self, data: Iterable[Dict[str, Any]], output_file: str) -> None:
         """Export data to specified format."""
         pass
 
 
-class JSONExporter(DataExporter):    
-    def export(self, data: List[Dict[str, Any]], output_file: str) -> None:
-        """Export data to JSON file."""
-        with open(output_file, 'w', encoding='utf-8') as file:
-            json.dump(data, file, indent=2, ensure_ascii=False)
-        print(f"Data successfully exported to {output_file} in JSON format")
+class SectionedExporter(DataExporter):    
+    """Exporter whose output is a prefix, one section per room joined by a separator, and a suffix.
 
+    Sections are rendered to bytes independently, which lets the incremental
+    mode copy unchanged rooms from the previous output and re-render only the
+    rooms that changed.
+    """
 
-class XMLExporter(DataExporter):    
-    def export(self, data: List[Dict[str, Any]], output_file: str) -> None:
-        """Export data to XML file."""
-        root = Element('rooms')
-        
-        for room in data:
-            room_elem = SubElement(root, 'room')
-            room_elem.set('number', str(room['room_number']))
-            
-            name_elem = SubElement(room_elem, 'room_name')
-            name_elem.text = room['room_name']
-            
-            count_elem = SubElement(room_elem, 'student_count')
-            count_elem.text = str(room['student_count'])
-            
-            students_elem = SubElement(room_elem, 'students')
+    label = ''
+    prefix = b''
+    separator = b''
+    suffix = b''
+    # Whole output when there are no rooms; prefix + suffix when None.
+    empty: Optional[bytes] = None
+
+    @abstractmethod
+    def render_room(self, room: Dict[str, Any]) -> bytes:
+        """Render one room's section."""
+        pass
+
+    def export(self, data: Iterable[Dict[str, Any]], output_file: str) -> None:
+        """Export data to file, writing one room at a time."""
+        with open_file(output_file, 'wb') as file:
+            self.write(data, file)
+        print(f"Data successfully exported to {output_file} in {self.label} format")
+
+    def write(self, data: Iterable[Dict[str, Any]], file: BinaryIO) -> None:
+        """Write the prefix, each room's section and the suffix."""
+        rooms = iter(data)
+        room = next(rooms, None)
+        if room is None:
+            file.write(self.prefix + self.suffix if self.empty is None else self.empty)
+            return
+        file.write(self.prefix)
+        file.write(self.render_room(room))
+        for room in rooms:
+            file.write(self.separator)
+            file.write(self.render_room(room))
+        file.write(self.suffix)
+
+
+class JSONExporter(SectionedExporter):    
+    STYLES = ('pretty', 'compact', 'ndjson')
+
+    def __init__(self, style: str = 'pretty', compact: bool = False):
+        super().__init__(compact)
+        if style not in self.STYLES:
+            raise ValueError(f"Unsupported JSON style: {style}")
+        self.style = 'compact' if compact and style == 'pretty' else style
+        if self.style == 'ndjson':
+            self.label = 'NDJSON'
+        elif self.style == 'compact':
+            self.label, self.prefix, self.separator, self.suffix, self.empty = 'JSON', b'[', b',', b']', b'[]'
+        else:
+            # Same text as json.dump(data, indent=2): rooms nested one level.
+            self.label, self.prefix, self.separator, self.suffix, self.empty = (
+                'JSON', b'[\n  ', b',\n  ', b'\n]', b'[]')
+
+    def render_room(self, room: Dict[str, Any]) -> bytes:
+        """Render a room as compact JSON, an NDJSON line or indented JSON one level deep."""
+        if self.style == 'ndjson':
+            return (_compact_json(room) + '\n').encode('utf-8')
+        if self.style == 'compact':
+            return _compact_json(room).encode('utf-8')
+        # JSON strings never hold a raw newline, so re-indenting lines is safe.
+        return json.dumps(room, ensure_ascii=False, indent=2).replace('\n', '\n  ').encode('utf-8')
+
+
+def _compact_json(room: Dict[str, Any]) -> str:
+    return json.dumps(room, ensure_ascii=False, separators=(',', ':'))
+
+
+class XMLExporter(SectionedExporter):    
+    """Indented XML laid out like minidom's toprettyxml()."""
+
+    label = 'XML'
+    prefix = b'<?xml version="1.0" ?>\n<rooms>\n'
+    suffix = b'</rooms>'
+    empty = b'<?xml version="1.0" ?>\n<rooms/>'
+
+    def render_room(self, room: Dict[str, Any]) -> bytes:
+        """Render one <room> element and its trailing newline."""
+        room_name = room['room_name']
+        lines = [
+            f'  <room number="{_xml_escape(str(room["room_number"]))}">',
+            f'    <room_name>{_xml_escape(room_name)}</room_name>' if room_name else '    <room_name/>',
+            f'    <student_count>{room["student_count"]}</student_count>',
+        ]
+        if room['students']:
+            lines.append('    <students>')
+            for student in room['students']:
+                student_id = _xml_escape(str(student['id']))
+                name = student['name']
+                lines.append(f'      <student id="{student_id}">{_xml_escape(name)}</student>' if name
+                             else f'      <student id="{student_id}"/>')
+            lines.append('    </students>')
+        else:
+            lines.append('    <students/>')
+        lines.append('  </room>\n')
+        return '\n'.join(lines).encode('utf-8')
+
+
+def _xml_escape(text: str) -> str:
+    return escape(text, XML_ENTITIES)
+
+
+class CSVExporter(SectionedExporter):    
+    """Header plus one row per student; a room without students gets one row with empty student columns."""
+
+    label = 'CSV'
+    prefix = (','.join(CSV_HEADER) + '\r\n').encode('utf-8')
+
+    def render_room(self, room: Dict[str, Any]) -> bytes:
+        """Render the rows of one room."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        prefix = (room['room_number'], room['room_name'], room['student_count'])
+        if room['students']:
+            writer.writerows(prefix + (student['id'], student['name']) for student in room['students'])
+        else:
+            writer.writerow(prefix + ('', ''))
+        return buffer.getvalue().encode('utf-8')
+
+
+class BinaryExporter(SectionedExporter):    
+    """Length-prefixed little-endian struct layout.
+
+    The file starts with MAGIC, then one block per room: a u32 byte length of
+    the rest of the block, the i64 room number, the u32-length-prefixed UTF-8
+    room name and the u32 student count, followed by each student as an i64
+    id and a u32-length-prefixed UTF-8 name. Room numbers and student ids
+    must be integers.
+    """
+
+    MAGIC = b'RSTB\x01'
+    BLOCK = struct.Struct('<I')
+    ROOM = struct.Struct('<qI')
+    COUNT = struct.Struct('<I')
+    STUDENT = struct.Struct('<qI')
+
+    label = 'binary'
+    prefix = MAGIC
+
+    def render_room(self, room: Dict[str, Any]) -> bytes:
+        """Render one length-prefixed room block."""
+        student_header = self.STUDENT.pack
+        name = room['room_name'].encode('utf-8')
+        try:
+            parts = [b'', self.ROOM.pack(room['room_number'], len(name)), name,
+                     self.COUNT.pack(len(room['students']))]
             for student in room['students']:
-                student_elem = SubElement(students_elem, 'student')
-                student_elem.set('id', str(student['id']))
-                student_elem.text = student['name']
-        
-        xml_str = tostring(root, encoding='unicode')
-        pretty_xml = minidom.parseString(xml_str).toprettyxml(indent='  ')
-        pretty_xml = '\n'.join([line for line in pretty_xml.split('\n') if line.strip()])
-        
-        with open(output_file, 'w', encoding='utf-8') as file:
-            file.write(pretty_xml)
-        
-        print(f"Data successfully exported to {output_file} in XML format")
+                student_name = student['name'].encode('utf-8')
+                parts.append(student_header(student['id'], len(student_name)))
+                parts.append(student_name)
+        except struct.error as e:
+            raise ValueError(f"Binary format needs 64-bit integer room numbers and student ids: {e}")
+        parts[0] = self.BLOCK.pack(sum(map(len, parts)))
+        return b''.join(parts)
+
+    @classmethod
+    def read(cls, input_file: str) -> Iterator[Dict[str, Any]]:
+        """Yield the rooms of a file written by this exporter, one block at a time."""
+        with open_file(input_file, 'rb') as file:
+            if file.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(f"Not a room/student binary file: {input_file}")
+            while True:
+                header = file.read(cls.BLOCK.size)
+                if not header:
+                    return
+                if len(header) < cls.BLOCK.size:
+                    raise ValueError(f"Truncated binary file: {input_file}")
+                (length,) = cls.BLOCK.unpack(header)
+                block = file.read(length)
+                if len(block) < length:
+                    raise ValueError(f"Truncated binary file: {input_file}")
+                yield cls._decode_room(block)
+
+    @classmethod
+    def _decode_room(cls, block: bytes) -> Dict[str, Any]:
+        room_number, name_length = cls.ROOM.unpack_from(block)
+        position = cls.ROOM.size
+        room_name = block[position:position + name_length].decode('utf-8')
+        position += name_length
+        (student_count,) = cls.COUNT.unpack_from(block, position)
+        position += cls.COUNT.size
+        unpack_student, student_size = cls.STUDENT.unpack_from, cls.STUDENT.size
+        students = []
+        for _ in range(student_count):
+            student_id, name_length = unpack_student(block, position)
+            position += student_size
+            students.append({'id': student_id, 'name': block[position:position + name_length].decode('utf-8')})
+            position += name_length
+        return {'room_number': room_number, 'students': students,
+                'room_name': room_name, 'student_count': student_count}
+
+
+class ParquetExporter(DataExporter):    
+    """Flat student rows, like CSVExporter, in Parquet row groups. Needs pyarrow."""
+
+    def export(self, data: Iterable[Dict[str, Any]], output_file: str) -> None:
+        """Export data to a Parquet file, one row group per PARQUET_ROW_GROUP students."""
+        # Imported here: pyarrow is optional and slow to import.
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([('room_number', pa.int64()), ('room_name', pa.string()),
+                            ('student_count', pa.int64()), ('student_id', pa.int64()),
+                            ('student_name', pa.string())])
+        with open_file(output_file, 'wb') as sink, pq.ParquetWriter(sink, schema) as writer:
+            columns = {name: [] for name in CSV_HEADER}
+            for room in data:
+                students = room['students'] or [{'id': None, 'name': None}]
+                columns['room_number'].extend([room['room_number']] * len(students))
+                columns['room_name'].extend([room['room_name']] * len(students))
+                columns['student_count'].extend([room['student_count']] * len(students))
+                columns['student_id'].extend(student['id'] for student in students)
+                columns['student_name'].extend(student['name'] for student in students)
+                if len(columns['student_id']) >= PARQUET_ROW_GROUP:
+                    writer.write_table(pa.table(columns, schema=schema))
+                    columns = {name: [] for name in CSV_HEADER}
+            if columns['student_id']:
+                writer.write_table(pa.table(columns, schema=schema))
+        print(f"Data successfully exported to {output_file} in Parquet format")
 
 
 class ExporterFactory:    
-    @staticmethod
-    def create_exporter(output_format: str) -> DataExporter:
+    _exporters: Dict[str, Callable[..., DataExporter]] = {}
+
+    @classmethod
+    def register(cls, output_format: str, factory: Callable[..., DataExporter]) -> None:
+        """Make factory(compact=...) the exporter for output_format, replacing any earlier one."""
+        cls._exporters[output_format.lower()] = factory
+
+    @classmethod
+    def formats(cls) -> List[str]:
+        """Names of the registered output formats."""
+        return sorted(cls._exporters)
+
+    @classmethod
+    def create_exporter(cls, output_format: str, compact: bool = False) -> DataExporter:
         """Create exporter based on format."""
-        if output_format.lower() == 'json':
-            return JSONExporter()
-        elif output_format.lower() == 'xml':
-            return XMLExporter()
-        else:
+        factory = cls._exporters.get(output_format.lower())
+        if factory is None:
             raise ValueError(f"Unsupported format: {output_format}")
+        return factory(compact=compact)
+
+
+ExporterFactory.register('json', JSONExporter)
+ExporterFactory.register('ndjson', partial(JSONExporter, 'ndjson'))
+ExporterFactory.register('xml', XMLExporter)
+ExporterFactory.register('csv', CSVExporter)
+ExporterFactory.register('bin', BinaryExporter)
+if importlib.util.find_spec('pyarrow') is not None:
+    ExporterFactory.register('parquet', ParquetExporter)
+
+
+class RoomStatistics:
+    """Occupancy figures gathered while the rooms stream to the exporter.
+
+    Room count, student total, min/max/mean room size and a histogram of
+    room sizes in bins of bin_width students are running totals; the
+    top_rooms fullest rooms are kept in a min-heap of that size, so memory
+    does not grow with the number of rooms or students.
+    """
+
+    def __init__(self, top_rooms: int = DEFAULT_TOP_ROOMS, bin_width: int = DEFAULT_BIN_WIDTH):
+        if top_rooms < 0 or bin_width < 1:
+            raise ValueError(f"Invalid statistics settings: top_rooms={top_rooms}, bin_width={bin_width}")
+        self.top_rooms = top_rooms
+        self.bin_width = bin_width
+        self.rooms = 0
+        self.students = 0
+        self.smallest: Optional[int] = None
+        self.largest: Optional[int] = None
+        self.histogram: Dict[int, int] = defaultdict(int)
+        # (student_count, -position, room_number, room_name): the smallest
+        # entry is the one to drop, and of equal rooms the later one goes.
+        self._fullest: List[Tuple[int, int, Any, str]] = []
+
+    def observe(self, rooms: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield rooms unchanged, adding each one to the statistics on the way."""
+        for room in rooms:
+            self.add(room)
+            yield room
+
+    def add(self, room: Dict[str, Any]) -> None:
+        """Add one room."""
+        size = room['student_count']
+        if self.rooms == 0:
+            self.smallest = self.largest = size
+        else:
+            self.smallest = min(self.smallest, size)
+            self.largest = max(self.largest, size)
+        self.rooms += 1
+        self.students += size
+        self.histogram[size // self.bin_width] += 1
+        entry = (size, -self.rooms, room['room_number'], room['room_name'])
+        if len(self._fullest) < self.top_rooms:
+            heapq.heappush(self._fullest, entry)
+        elif self.top_rooms and entry > self._fullest[0]:
+            heapq.heapreplace(self._fullest, entry)
+
+    def summary(self) -> Dict[str, Any]:
+        """The statistics as a JSON-ready dict."""
+        return {
+            'rooms': self.rooms,
+            'students': self.students,
+            'min_students': self.smallest,
+            'max_students': self.largest,
+            'mean_students': self.students / self.rooms if self.rooms else None,
+            'histogram': [
+                {'min_students': index * self.bin_width, 'max_students': (index + 1) * self.bin_width - 1,
+                 'rooms': count}
+                for index, count in sorted(self.histogram.items())
+            ],
+            'fullest_rooms': [
+                {'room_number': room_number, 'room_name': room_name, 'student_count': size}
+                for size, _, room_number, room_name in sorted(self._fullest, reverse=True)
+            ],
+        }
+
+    def export(self, stats_file: str) -> None:
+        """Write the summary to a JSON file."""
+        with open_file(stats_file, 'w') as file:
+            json.dump(self.summary(), file, indent=2, ensure_ascii=False)
+        print(f"Statistics successfully written to {stats_file}")
 
 
 class RoomStudentProcessor:    
-    def __init__(self):
+    def __init__(self, workers: int = 1, stats_file: Optional[str] = None, top_rooms: int = DEFAULT_TOP_ROOMS,
+                 bin_width: int = DEFAULT_BIN_WIDTH, json_backend: Optional[str] = None):
         self.loader = DataLoader()
         self.combiner = DataCombiner()
+        self.workers = workers
+        self.stats_file = stats_file
+        self.top_rooms = top_rooms
+        self.bin_width = bin_width
+        self.json_backend = json_backend
     
-    def process(self, students_file: str, rooms_file: str, output_file: str, output_format: str) -> None:
+    def process(self, students_file: Union[str, List[str]], rooms_file: str, output_file: str, output_format: str,
+                compact: bool = False) -> None:
         """Process the data from input files to output file."""
+        students_files = [students_file] if isinstance(students_file, str) else students_file
         try:
-            students = self.loader.load_json(students_file)
-            rooms = self.loader.load_json(rooms_file)
-            combined_data = self.combiner.combine_data(students, rooms)
-            exporter = ExporterFactory.create_exporter(output_format)
-            exporter.export(combined_data, output_file)
+            combined_rooms = self.combine(students_files, rooms_file)
+            statistics = self.statistics()
+            if statistics is not None:
+                combined_rooms = statistics.observe(combined_rooms)
+            exporter = ExporterFactory.create_exporter(output_format, compact)
+            exporter.export(combined_rooms, output_file)
+            if statistics is not None:
+                statistics.export(self.stats_file)
             
         except Exception as e:
             print(f"Error processing data: {e}")
             sys.exit(1)
 
+    def combine(self, students_files: List[str], rooms_file: str) -> Iterator[Dict[str, Any]]:
+        """Load the rooms, group the students and join the two, yielding rooms in room order."""
+        room_names = self.combiner.index_rooms(self.loader.load_json(rooms_file, self.json_backend))
+        room_count = self.combiner.dense_room_count(room_names)
+        students_by_room = self.group(students_files, room_count)
+        return self.combiner.join(students_by_room, room_names, room_count)
+
+    def statistics(self) -> Optional[RoomStatistics]:
+        """A fresh RoomStatistics when a stats file was asked for."""
+        if self.stats_file is None:
+            return None
+        return RoomStatistics(self.top_rooms, self.bin_width)
+
+    def group(self, students_files: List[str], room_count: Optional[int] = None) -> Dict[Any, List[StudentRecord]]:
+        """Group the students of all files by room, in parallel when workers > 1."""
+        if self.workers > 1:
+            return self.group_parallel(students_files, room_count)
+        students = chain.from_iterable(self.loader.iter_json(path, backend=self.json_backend) for path in students_files)
+        return self.combiner.group_students(students, room_count)
+
+    def group_parallel(self, students_files: List[str],
+                       room_count: Optional[int] = None) -> Dict[Any, List[StudentRecord]]:
+        """Group students by room on a process pool, one shard per task, merged in shard order."""
+        shards = self.loader.shards(students_files, self.workers * SHARDS_PER_WORKER)
+        if len(shards) == 1:
+            return self.combiner.group_students(self.loader.iter_shard(shards[0], self.json_backend), room_count)
+        group_shard = partial(_group_shard, room_count=room_count, backend=self.json_backend)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return self.combiner.merge_groups(executor.map(group_shard, shards))
+
+
+def _group_shard(shard: Shard, room_count: Optional[int] = None,
+                 backend: Optional[str] = None) -> Dict[Any, List[StudentRecord]]:
+    # Only non-empty groups are sent back: a shard sees a few of the rooms.
+    grouped = DataCombiner.group_students(DataLoader.iter_shard(shard, backend), room_count)
+    return {room_number: assigned_students
+            for room_number, assigned_students in grouped.items() if assigned_students}
+
+
+class IncrementalProcessor(RoomStudentProcessor):
+    """Re-runs that reuse the previous output for rooms whose content did not change.
+
+    The checkpoint holds two JSON lines. The first records the format, the
+    statistics settings and the input and output file fingerprints (size and
+    mtime), so a run whose inputs and settings did not change stops after
+    reading it. The second lists every room's content hash, the byte range
+    of its section in the output and its student ids. Otherwise students
+    are regrouped, rooms with a new hash are re-rendered and the other
+    sections are copied from the old output. Formats that are not a
+    SectionedExporter (Parquet), or a missing, stale or mismatched
+    checkpoint, give a full run.
+    """
+
+    def __init__(self, workers: int = 1, checkpoint_file: Optional[str] = None, stats_file: Optional[str] = None,
+                 top_rooms: int = DEFAULT_TOP_ROOMS, bin_width: int = DEFAULT_BIN_WIDTH,
+                 json_backend: Optional[str] = None):
+        super().__init__(workers, stats_file, top_rooms, bin_width, json_backend)
+        self.checkpoint_file = checkpoint_file
+
+    def process(self, students_file: Union[str, List[str]], rooms_file: str, output_file: str, output_format: str,
+                compact: bool = False) -> None:
+        """Update output file from the input files, re-rendering only rooms that changed."""
+        students_files = [students_file] if isinstance(students_file, str) else students_file
+        checkpoint_file = self.checkpoint_file or output_file + CHECKPOINT_SUFFIX
+        exporter = ExporterFactory.create_exporter(output_format, compact)
+        if not isinstance(exporter, SectionedExporter):
+            print(f"Format {output_format} cannot be patched; running a full export")
+            super().process(students_files, rooms_file, output_file, output_format, compact)
+            if os.path.exists(checkpoint_file):
+                os.remove(checkpoint_file)
+            return
+        try:
+            header = {
+                'version': CHECKPOINT_VERSION,
+                'settings': {'format': output_format.lower(), 'compact': compact},
+                'inputs': {path: _fingerprint(path) for path in students_files + [rooms_file]},
+                'stats': None if self.stats_file is None else {
+                    'file': self.stats_file, 'top_rooms': self.top_rooms, 'bin_width': self.bin_width},
+            }
+            with self._open_checkpoint(checkpoint_file, header, output_file) as checkpoint:
+                previous_header = json.loads(checkpoint.readline() or 'null')
+                # Statistics asked for for the first time, or with other settings, still need the rooms.
+                if (previous_header is not None and previous_header['inputs'] == header['inputs']
+                        and (self.stats_file is None or (previous_header.get('stats') == header['stats']
+                                                         and os.path.exists(self.stats_file)))):
+                    print(f"Inputs unchanged; {output_file} is up to date")
+                    return
+                previous = {entry[0]: entry[1:] for entry in json.loads(checkpoint.readline() or '[]')}
+
+            combined_rooms = self.combine(students_files, rooms_file)
+            statistics = self.statistics()
+            if statistics is not None:
+                combined_rooms = statistics.observe(combined_rooms)
+            sections, changed = self._write(exporter, combined_rooms, output_file, previous)
+            header['output'] = _fingerprint(output_file)
+            temporary = checkpoint_file + '.tmp'
+            with open(temporary, 'w', encoding='utf-8') as f:
+                # dumps() rather than dump(): only dumps() uses the C encoder.
+                f.write(json.dumps(header) + '\n' + json.dumps(sections, separators=(',', ':')) + '\n')
+            os.replace(temporary, checkpoint_file)
+
+            # A student who moved left a room and joined another, so both were
+            # re-rendered (or the old one removed): only those rooms are compared.
+            current = {entry[0]: entry[4] for entry in sections}
+            removed = [room for room in previous if room not in current]
+            before = {student_id: room for room in chain(changed, removed) if room in previous
+                      for student_id in previous[room][3]}
+            moved = sum(1 for room in changed for student_id in current[room]
+                        if before.get(student_id, room) != room)
+            print(f"Data successfully exported to {output_file} in {exporter.label} format "
+                  f"(incremental: {len(changed)} rooms re-rendered, {len(sections) - len(changed)} reused, "
+                  f"{len(removed)} removed; {moved} students moved rooms)")
+            if statistics is not None:
+                statistics.export(self.stats_file)
+
+        except Exception as e:
+            print(f"Error processing data: {e}")
+            sys.exit(1)
+
+    @staticmethod
+    def _write(exporter: SectionedExporter, combined_rooms: Iterator[Dict[str, Any]], output_file: str,
+               previous: Dict[Any, List[Any]]) -> Tuple[List[List[Any]], List[Any]]:
+        """Write the new output next to the old one and swap it in; returns the section table and re-rendered rooms."""
+        sections: List[List[Any]] = []
+        changed = []
+        temporary = output_file + '.tmp'
+        with open_file(temporary, 'wb', name=output_file) as file, \
+                open_file(output_file if previous else os.devnull, 'rb') as old:
+            position = old_position = 0
+            for room in combined_rooms:
+                separator = exporter.separator if sections else exporter.prefix
+                file.write(separator)
+                position += len(separator)
+                # marshal version 2 has no back-references, so equal rooms
+                # always give equal bytes; it is also 3x faster than JSON.
+                digest = hashlib.blake2b(marshal.dumps(room, 2), digest_size=16).hexdigest()
+                entry = previous.get(room['room_number'])
+                if entry is not None and entry[0] == digest and (old.seekable() or entry[1] >= old_position):
+                    if old.seekable():
+                        old.seek(entry[1])
+                    else:
+                        # zstandard streams only read forward; sections come in file order.
+                        _skip(old, entry[1] - old_position)
+                    section = old.read(entry[2])
+                    old_position = entry[1] + entry[2]
+                else:
+                    section = exporter.render_room(room)
+                    changed.append(room['room_number'])
+                file.write(section)
+                sections.append([room['room_number'], digest, position, len(section),
+                                 [student['id'] for student in room['students']]])
+                position += len(section)
+            if sections:
+                file.write(exporter.suffix)
+            else:
+                file.write(exporter.prefix + exporter.suffix if exporter.empty is None else exporter.empty)
+        os.replace(temporary, output_file)
+        return sections, changed
+
+    @staticmethod
+    def _open_checkpoint(checkpoint_file: str, header: Dict[str, Any], output_file: str) -> TextIO:
+        """The checkpoint positioned at its start if it matches header's settings and the output
+        is as it left it; otherwise an empty stream, which means a full run."""
+        try:
+            checkpoint = open(checkpoint_file, 'r', encoding='utf-8')
+        except OSError:
+            return io.StringIO()
+        try:
+            previous = json.loads(checkpoint.readline())
+            if (previous.get('version') == header['version'] and previous.get('settings') == header['settings']
+                    and previous.get('output') == _fingerprint(output_file)):
+                checkpoint.seek(0)
+                return checkpoint
+        except (OSError, ValueError, AttributeError):
+            pass
+        checkpoint.close()
+        return io.StringIO()
+
+
+def _skip(file: BinaryIO, count: int) -> None:
+    while count > 0:
+        data = file.read(min(count, CHUNK_SIZE))
+        if not data:
+            return
+        count -= len(data)
+
+
+def _fingerprint(filepath: str) -> List[int]:
+    stat = os.stat(filepath)
+    return [stat.st_size, stat.st_mtime_ns]
+
 
 def parse_arguments():
     parser = argparse.ArgumentParser(
-        description='Process room-student data and export to JSON or XML format',
+        description='Process room-student data and export to JSON, XML, CSV, binary or Parquet format',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   python reader.py --format json
   python3 reader.py --students hw2/students.json --rooms hw2/rooms.json --output result.xml --format xml
+  python reader.py --format ndjson --output rooms.ndjson
+  python reader.py --students shards/*.ndjson --workers 8 --format json
+  python reader.py --incremental --format json   # re-render only rooms that changed since the last run
+  python reader.py --format json --stats stats.json --top-rooms 20
+  python reader.py --students students.json.gz --output output.xml.gz
+  python reader.py --students students.ndjson --json-backend auto
         """
     )
     
     parser.add_argument(
         '--students', 
-        default='students.json',
-        help='Path to students JSON file (default: students.json)'
+        nargs='+',
+        default=['students.json'],
+        help='Paths to students JSON array or NDJSON files, read incrementally in order; .gz, .bz2, .xz and '
+             '.zst files are decompressed on the fly (default: students.json)'
     )
     
     parser.add_argument(
@@ -154,18 +1079,69 @@ Examples:
     
     parser.add_argument(
         '--output', '-o',
-        help='Output file path (default: output.{format})'
+        help='Output file path; a .gz, .bz2, .xz or .zst suffix compresses it (default: output.{format})'
     )
     
     
 
     parser.add_argument(
     '--format', '-f',
-    choices=['json', 'xml'],
+    choices=ExporterFactory.formats(),
     default='xml', 
-    help='Output format: json or xml (default: xml)'
+    help='Output format: json, ndjson (one room per line), xml, csv (one row per student), '
+         'bin (length-prefixed binary) or parquet when pyarrow is installed (default: xml)'
 )
 
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        help='Group students on this many processes; NDJSON files are split by byte range (default: 1)'
+    )
+
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Reuse the previous output and re-render only rooms whose students changed'
+    )
+
+    parser.add_argument(
+        '--checkpoint',
+        help='Checkpoint file for --incremental (default: {output}.checkpoint)'
+    )
+
+    parser.add_argument(
+        '--json-backend',
+        choices=['auto'] + JSONBackends.names(),
+        help='Decode memory-mapped inputs with this JSON library (auto: fastest installed). NDJSON is still '
+             'read line by line, but a JSON array is decoded whole. Default: stream with the json module'
+    )
+
+    parser.add_argument(
+        '--stats',
+        help='Also write room occupancy statistics (min/max/mean, histogram, fullest rooms) to this JSON file'
+    )
+
+    parser.add_argument(
+        '--top-rooms',
+        type=int,
+        default=DEFAULT_TOP_ROOMS,
+        help=f'Fullest rooms listed in --stats (default: {DEFAULT_TOP_ROOMS})'
+    )
+
+    parser.add_argument(
+        '--bin-width',
+        type=int,
+        default=DEFAULT_BIN_WIDTH,
+        help=f'Students per histogram bin in --stats (default: {DEFAULT_BIN_WIDTH})'
+    )
+
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Write JSON without indentation or spaces (json format only)'
+    )
+
     return parser.parse_args()
 
 
@@ -174,13 +1150,23 @@ def main():
     args = parse_arguments()
     if not args.output:
         args.output = f"output.{args.format}"
-    for file_path in [args.students, args.rooms]:
+    if args.workers < 1:
+        print(f"Error: --workers must be at least 1, got {args.workers}.")
+        sys.exit(1)
+    if args.top_rooms < 0 or args.bin_width < 1:
+        print("Error: --top-rooms must be at least 0 and --bin-width at least 1.")
+        sys.exit(1)
+    for file_path in args.students + [args.rooms]:
         if not Path(file_path).exists():
             print(f"Error: Input file '{file_path}' does not exist.")
             sys.exit(1)
     
-    processor = RoomStudentProcessor()
-    processor.process(args.students, args.rooms, args.output, args.format)
+    if args.incremental:
+        processor = IncrementalProcessor(args.workers, args.checkpoint, args.stats, args.top_rooms, args.bin_width,
+                                         args.json_backend)
+    else:
+        processor = RoomStudentProcessor(args.workers, args.stats, args.top_rooms, args.bin_width, args.json_backend)
+    processor.process(args.students, args.rooms, args.output, args.format, args.compact)
 
 
 if __name__ == '__main__':
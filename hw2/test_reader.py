@@ -0,0 +1,513 @@
+import csv
+import gzip
+import importlib.util
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from itertools import chain
+from unittest import mock
+from xml.dom import minidom
+from xml.etree.ElementTree import Element, SubElement, tostring
+
+import reader
+from reader import (CHECKPOINT_SUFFIX, CODECS, CSV_HEADER, ZSTD_SUFFIX, BinaryExporter, CSVExporter, DataCombiner,
+                    DataLoader, ExporterFactory, IncrementalProcessor, JSONBackends, JSONExporter, RoomStudentProcessor,
+                    XMLExporter, open_file)
+
+
+SAMPLES = 200
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+NAMES = ['Room #1', 'Ann "A" <b>', 'O\'Neil & Co', 'Žofia', '', '日本', ' ', 'a\\b', 'line\nbreak']
+
+
+def random_value(rng: random.Random, depth: int = 0):
+    kind = rng.randrange(7 if depth < 2 else 5)
+    if kind == 0:
+        return rng.randint(-10 ** 6, 10 ** 6)
+    if kind == 1:
+        return rng.choice([0.5, -23.25, 1e-7, 3.0e10])
+    if kind == 2:
+        return rng.choice(NAMES)
+    if kind == 3:
+        return rng.choice([True, False, None])
+    if kind == 4:
+        return {'id': rng.randint(0, 999), 'name': rng.choice(NAMES), 'room': rng.randint(0, 9)}
+    if kind == 5:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+    return {rng.choice(NAMES): random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))}
+
+
+def random_rooms(rng: random.Random, count: int):
+    """Combined rooms with empty and special-character names and some rooms without students."""
+    rooms = []
+    for number in range(count):
+        students = [{'id': rng.randint(0, 10 ** 6), 'name': rng.choice(NAMES)} for _ in range(rng.choice([0, 0, 1, 3]))]
+        rooms.append({'room_number': number, 'room_name': rng.choice(NAMES),
+                      'student_count': len(students), 'students': students})
+    return rooms
+
+
+def minidom_xml_write(data, file) -> None:
+    """XML as XMLExporter wrote it before streaming: ElementTree, then a minidom toprettyxml() round-trip."""
+    root = Element('rooms')
+    for room in data:
+        room_elem = SubElement(root, 'room')
+        room_elem.set('number', str(room['room_number']))
+        SubElement(room_elem, 'room_name').text = room['room_name']
+        SubElement(room_elem, 'student_count').text = str(room['student_count'])
+        students_elem = SubElement(room_elem, 'students')
+        for student in room['students']:
+            student_elem = SubElement(students_elem, 'student')
+            student_elem.set('id', str(student['id']))
+            student_elem.text = student['name']
+    pretty_xml = minidom.parseString(tostring(root, encoding='unicode')).toprettyxml(indent='  ')
+    file.write('\n'.join([line for line in pretty_xml.split('\n') if line.strip()]))
+
+
+def json_dump_write(data, file) -> None:
+    """JSON as JSONExporter wrote it before streaming: one json.dump() of the whole list."""
+    json.dump(data, file, indent=2, ensure_ascii=False)
+
+
+def legacy_output(write, rooms) -> bytes:
+    file = io.StringIO()
+    write(rooms, file)
+    return file.getvalue().encode('utf-8')
+
+
+def exporter_output(exporter, rooms) -> bytes:
+    file = io.BytesIO()
+    exporter.write(iter(rooms), file)
+    return file.getvalue()
+
+
+class IterJsonTests(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(15)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_array_matches_json_load(self):
+        for _ in range(SAMPLES):
+            records = [random_value(self.rng) for _ in range(self.rng.randint(0, 8))]
+            indent = self.rng.choice([None, 0, 2])
+            path = self.write('data.json', ' \n' * self.rng.randint(0, 2) + json.dumps(records, indent=indent) + '\n')
+            with open(path, encoding='utf-8') as f:
+                expected = json.load(f)
+            for chunk_size in (1, 2, 3, 7):
+                self.assertEqual(list(DataLoader.iter_json(path, chunk_size=chunk_size)), expected)
+
+    def test_ndjson_matches_json_loads(self):
+        records = [random_value(self.rng) for _ in range(SAMPLES)]
+        path = self.write('data.ndjson', '\n'.join(json.dumps(record) for record in records) + '\n\n')
+        for chunk_size in (1, 2, 3, 7):
+            self.assertEqual(list(DataLoader.iter_json(path, chunk_size=chunk_size)), records)
+
+    def test_rejects_what_json_load_rejects(self):
+        for text in ['[1]]', '[1] x', '[1, 2] [3]', '[1,]', '[1 2]', '[1', '[', '[{"a": 1}', '["a]"]x']:
+            path = self.write('bad.json', text)
+            with self.assertRaises(ValueError):
+                json.loads(text)
+            for chunk_size in (1, 2, 3, 7):
+                with self.assertRaises(ValueError, msg=(text, chunk_size)):
+                    list(DataLoader.iter_json(path, chunk_size=chunk_size))
+
+
+class JSONBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(25)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.directory, name)
+        with open_file(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_backends_match_streaming_loader(self):
+        records = [random_value(self.rng) for _ in range(SAMPLES)]
+        paths = [
+            self.write('data.json', json.dumps(records, indent=1)),
+            self.write('data.ndjson', ''.join(json.dumps(record) + '\n\n' for record in records)),
+            self.write('data.ndjson.gz', ''.join(json.dumps(record) + '\n' for record in records)),
+            self.write('empty.json', '[]'),
+            self.write('empty.ndjson', ''),
+        ]
+        self.assertIn('json', JSONBackends.available())
+        for backend in JSONBackends.available() + ['auto']:
+            for path in paths:
+                with self.subTest(backend=backend, path=os.path.basename(path)):
+                    self.assertEqual(list(DataLoader.iter_json(path, backend=backend)),
+                                     list(DataLoader.iter_json(path)))
+            self.assertEqual(DataLoader.load_json(paths[0], backend), records)
+            self.assertEqual(list(DataLoader.iter_shard((paths[1], 0, os.path.getsize(paths[1])), backend)), records)
+
+    def test_invalid_input_is_a_value_error(self):
+        invalid = [('bad.json', '[1, 2'), ('bad.ndjson', '{"a": 1}\n{"a": \n'), ('trailing.json', '[1] x')]
+        for backend in JSONBackends.available():
+            for name, text in invalid:
+                # The loader's own message shows the backend's error was caught and rewrapped.
+                with self.assertRaisesRegex(ValueError, 'Invalid JSON', msg=(backend, name)):
+                    list(DataLoader.iter_json(self.write(name, text), backend=backend))
+
+    def test_unknown_or_missing_backend(self):
+        with self.assertRaisesRegex(ValueError, 'Unsupported JSON backend: nope'):
+            JSONBackends.decoder('nope')
+        with mock.patch.dict(JSONBackends._backends), mock.patch.dict(JSONBackends._decoders):
+            JSONBackends.register('missing', 'no_such_json_module', lambda module: module.loads)
+            self.assertIn('missing', JSONBackends.names())
+            self.assertNotIn('missing', JSONBackends.available())
+            with self.assertRaisesRegex(ValueError, 'JSON backend missing is not installed'):
+                JSONBackends.decoder('missing')
+        self.assertNotIn('missing', JSONBackends.names())
+
+
+class CodecTests(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(24)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.students = [{'id': index, 'name': self.rng.choice(NAMES), 'room': self.rng.randrange(10)}
+                         for index in range(SAMPLES)]
+        self.rooms_file = os.path.join(self.directory, 'rooms.json')
+        with open(self.rooms_file, 'w', encoding='utf-8') as f:
+            json.dump([{'id': number, 'name': f"Room #{number}"} for number in range(10)], f)
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.directory, name)
+        with open_file(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def check_codec(self, suffix: str):
+        array = self.write('students.json' + suffix, '\n  ' + json.dumps(self.students, indent=1))
+        lines = ''.join(json.dumps(student) + '\n' for student in self.students)
+        ndjson = self.write('students.ndjson' + suffix, lines)
+        for path in (array, ndjson):
+            for chunk_size in (1, 7, 1 << 16):
+                self.assertEqual(list(DataLoader.iter_json(path, chunk_size=chunk_size)), self.students)
+            self.assertEqual(list(DataLoader.iter_json(path, backend='json')), self.students)
+            self.assertEqual(DataLoader.is_ndjson(path), path == ndjson)
+        self.assertEqual(DataLoader.load_json(array), self.students)
+        self.assertEqual(DataLoader.load_json(array, backend='json'), self.students)
+
+        outputs = []
+        for output in ('out.xml', 'out.xml' + suffix):
+            output = os.path.join(self.directory, output)
+            with redirect_stdout(io.StringIO()):
+                RoomStudentProcessor().process(ndjson, self.rooms_file, output, 'xml')
+            with open_file(output, 'rb') as f:
+                outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_codecs_stream_like_plain_files(self):
+        for suffix in sorted(set(CODECS) - {ZSTD_SUFFIX}):
+            with self.subTest(suffix=suffix):
+                self.check_codec(suffix)
+
+    @unittest.skipUnless(ZSTD_SUFFIX in CODECS, 'needs Python 3.14 or the zstandard package')
+    def test_zstd(self):
+        self.check_codec(ZSTD_SUFFIX)
+
+
+class ShardTests(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(18)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        students = [{'id': index, 'name': self.rng.choice(NAMES) * self.rng.randint(0, 5),
+                     'room': self.rng.randint(0, 9)} for index in range(SAMPLES)]
+        self.expected = students + students[:20] + students[20:40]
+        self.paths = [os.path.join(self.directory, name) for name in ('a.ndjson', 'b.json', 'c.ndjson.gz')]
+        with open(self.paths[0], 'w', encoding='utf-8') as f:
+            for student in students:
+                f.write(json.dumps(student, ensure_ascii=False) + '\n' * self.rng.randint(1, 2))
+        with open(self.paths[1], 'w', encoding='utf-8') as f:
+            json.dump(students[:20], f)
+        with gzip.open(self.paths[2], 'wt', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(student) + '\n' for student in students[20:40]))
+
+    def test_shards_cover_every_line_once(self):
+        for min_bytes in (1, 7, 100):
+            with mock.patch.object(reader, 'MIN_SHARD_BYTES', min_bytes):
+                for count in range(1, 40, 3):
+                    shards = DataLoader.shards(self.paths, count)
+                    self.assertEqual([shard[0] for shard in shards[-2:]], self.paths[1:])
+                    records = list(chain.from_iterable(DataLoader.iter_shard(shard) for shard in shards))
+                    self.assertEqual(records, self.expected, (min_bytes, count))
+
+    def test_group_parallel_matches_single_pass(self):
+        expected = DataCombiner.group_students(iter(self.expected))
+        with mock.patch.object(reader, 'MIN_SHARD_BYTES', 100):
+            grouped = RoomStudentProcessor(workers=2).group_parallel(self.paths)
+        self.assertEqual(dict(grouped), dict(expected))
+
+
+class JoinTests(unittest.TestCase):
+    def combine(self, students, rooms):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            combined = DataCombiner.combine_data(iter(students), rooms)
+        return combined, out.getvalue()
+
+    def test_every_room_in_order_with_students_in_input_order(self):
+        rooms = [{'id': number, 'name': f"Room #{number}"} for number in (3, 0, 2, 1)]
+        students = [{'id': 10, 'name': 'A', 'room': 2}, {'id': 11, 'name': 'B', 'room': 0},
+                    {'id': 12, 'name': 'C', 'room': 2}]
+        combined, warning = self.combine(students, rooms)
+        self.assertEqual(warning, '')
+        self.assertEqual([room['room_number'] for room in combined], [0, 1, 2, 3])
+        self.assertEqual(combined[1], {'room_number': 1, 'students': [], 'room_name': 'Room #1', 'student_count': 0})
+        self.assertEqual(combined[2]['students'], [{'id': 10, 'name': 'A'}, {'id': 12, 'name': 'C'}])
+        self.assertEqual(self.combine([], [])[0], [])
+
+    def test_students_of_unknown_rooms_are_left_out(self):
+        rooms = [{'id': 0, 'name': 'Zero'}, {'id': 2, 'name': 'Two'}]
+        students = [{'id': index, 'name': '', 'room': room}
+                    for index, room in enumerate([0, 7, 'B', 7, True, 'x', 0.5, 12, 13, 14, 15, 16, 17, 18, 19])]
+        combined, warning = self.combine(students, rooms)
+        self.assertEqual({room['room_number']: room['student_count'] for room in combined}, {0: 1, 2: 0})
+        self.assertIn('Warning: 14 students assigned to 13 unknown rooms (7, B, True, x, 0.5, 12, 13, 14, 15, 16, ...)',
+                      warning)
+
+    def test_duplicate_room_ids_are_rejected(self):
+        with self.assertRaisesRegex(ValueError, 'Duplicate room ids in rooms data: 1'):
+            self.combine([], [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}, {'id': 1, 'name': 'c'}])
+
+    def test_dense_room_ids_use_buckets_without_a_sort(self):
+        rng = random.Random(22)
+        rooms = [{'id': number, 'name': f"Room #{number}"} for number in range(8)]
+        students = [{'id': index, 'name': '', 'room': rng.choice([0, 1, 2, 3, 5, 7, -1, 8, 'a', None])}
+                    for index in range(SAMPLES)]
+        room_names = DataCombiner.index_rooms(rooms)
+        self.assertEqual(DataCombiner.dense_room_count(room_names), 8)
+        self.assertIsNone(DataCombiner.dense_room_count(DataCombiner.index_rooms(rooms[1:])))
+        self.assertEqual(dict(DataCombiner.group_students(iter(students), 8)),
+                         {**{number: [] for number in range(8)}, **DataCombiner.group_students(iter(students))})
+        with redirect_stdout(io.StringIO()):
+            expected = list(DataCombiner.join(DataCombiner.group_students(iter(students)), room_names))
+            with mock.patch('reader.sorted', side_effect=AssertionError('sorted a dense room index'), create=True):
+                self.assertEqual(list(DataCombiner.iter_rooms(iter(students), rooms)), expected)
+
+    def test_shards_send_back_only_occupied_rooms(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'students.ndjson')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('{"id": 1, "name": "A", "room": 3}\n{"id": 2, "name": "B", "room": "x"}\n')
+            self.assertEqual(reader._group_shard((path, 0, None), room_count=1000), {3: [(1, 'A')], 'x': [(2, 'B')]})
+
+
+class ExporterTests(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(16)
+
+    def test_xml_matches_legacy_exporter(self):
+        for count in [0, 1] + [self.rng.randint(2, 20) for _ in range(SAMPLES // 4)]:
+            rooms = random_rooms(self.rng, count)
+            self.assertEqual(exporter_output(XMLExporter(), rooms), legacy_output(minidom_xml_write, rooms))
+
+    def test_json_styles_match_json_dumps(self):
+        for count in [0, 1] + [self.rng.randint(2, 20) for _ in range(SAMPLES // 4)]:
+            rooms = random_rooms(self.rng, count)
+            self.assertEqual(exporter_output(JSONExporter('pretty'), rooms), legacy_output(json_dump_write, rooms))
+            self.assertEqual(exporter_output(JSONExporter(compact=True), rooms),
+                             json.dumps(rooms, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+            self.assertEqual(exporter_output(JSONExporter('ndjson'), rooms),
+                             ''.join(json.dumps(room, ensure_ascii=False, separators=(',', ':')) + '\n'
+                                     for room in rooms).encode('utf-8'))
+
+
+def flat_rows(rooms):
+    """The rows CSVExporter and ParquetExporter write: one per student, one per empty room."""
+    for room in rooms:
+        for student in room['students'] or [{'id': None, 'name': None}]:
+            yield [room['room_number'], room['room_name'], room['student_count'], student['id'], student['name']]
+
+
+class FormatTests(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(19)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.rooms = random_rooms(self.rng, SAMPLES)
+
+    def export(self, output_format: str, name: str, rooms=None) -> str:
+        path = os.path.join(self.directory, name)
+        with redirect_stdout(io.StringIO()):
+            ExporterFactory.create_exporter(output_format).export(iter(self.rooms if rooms is None else rooms), path)
+        return path
+
+    def test_binary_round_trip(self):
+        for name in ('rooms.bin', 'rooms.bin.gz'):
+            self.assertEqual(list(BinaryExporter.read(self.export('bin', name))), self.rooms)
+        self.assertEqual(list(BinaryExporter.read(self.export('bin', 'empty.bin', []))), [])
+
+    def test_binary_rejects_bad_input(self):
+        path = self.export('bin', 'rooms.bin')
+        with open(path, 'rb') as f:
+            data = f.read()
+        truncated = os.path.join(self.directory, 'truncated.bin')
+        with open(truncated, 'wb') as f:
+            f.write(data[:-1])
+        with self.assertRaises(ValueError):
+            list(BinaryExporter.read(truncated))
+        with self.assertRaises(ValueError):
+            list(BinaryExporter.read(self.export('csv', 'rooms.csv')))
+        with self.assertRaises(ValueError):
+            BinaryExporter().render_room({'room_number': 'A', 'room_name': '', 'student_count': 0, 'students': []})
+
+    def test_csv_rows(self):
+        with open(self.export('csv', 'rooms.csv'), newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        expected = [['' if value is None else str(value) for value in row] for row in flat_rows(self.rooms)]
+        self.assertEqual(rows, [CSV_HEADER] + expected)
+        self.assertIsInstance(ExporterFactory.create_exporter('CSV'), CSVExporter)
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_parquet_read_back(self):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(self.export('parquet', 'rooms.parquet'))
+        self.assertEqual(table.column_names, CSV_HEADER)
+        self.assertEqual([list(row.values()) for row in table.to_pylist()], list(flat_rows(self.rooms)))
+
+
+class IncrementalTests(unittest.TestCase):
+    ROOMS = 40
+    PATCHABLE = [('json', 'out.json'), ('ndjson', 'out.ndjson'), ('xml', 'out.xml'), ('xml', 'out.xml.gz'),
+                 ('csv', 'out.csv'), ('bin', 'out.bin')] + ([('json', 'out.json.zst')] if ZSTD_SUFFIX in CODECS else [])
+
+    def setUp(self):
+        self.rng = random.Random(20)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.students_file = os.path.join(self.directory, 'students.json')
+        self.rooms_file = os.path.join(self.directory, 'rooms.json')
+        self.students = [{'id': index, 'name': self.rng.choice(NAMES), 'room': self.rng.randrange(self.ROOMS)}
+                         for index in range(SAMPLES)]
+        self.rooms = [{'id': number, 'name': f"Room #{number}"} for number in range(self.ROOMS)]
+        self.save()
+
+    def save(self):
+        """Rewrite both inputs and push their mtimes forward, so the change is seen even
+        on file systems with coarse timestamps."""
+        for path, records in ((self.students_file, self.students), (self.rooms_file, self.rooms)):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(records, f)
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9 * self.rng.randint(1, 10 ** 6)))
+
+    def run_processor(self, processor, output_format: str, output: str) -> str:
+        out = io.StringIO()
+        with redirect_stdout(out):
+            processor.process(self.students_file, self.rooms_file, os.path.join(self.directory, output), output_format)
+        return out.getvalue()
+
+    def read(self, output: str) -> bytes:
+        # open_file() decompresses: gzip headers carry a timestamp.
+        with open_file(os.path.join(self.directory, output), 'rb') as f:
+            return f.read()
+
+    def assert_matches_full_run(self, output_format: str, output: str):
+        self.run_processor(RoomStudentProcessor(), output_format, 'full-' + output)
+        self.assertEqual(self.read(output), self.read('full-' + output))
+
+    def rerendered(self, message: str) -> int:
+        return int(re.search(r'incremental: (\d+) rooms re-rendered', message).group(1))
+
+    def test_patched_output_matches_full_run(self):
+        for output_format, output in self.PATCHABLE:
+            self.run_processor(IncrementalProcessor(), output_format, output)
+            self.assertIn('is up to date', self.run_processor(IncrementalProcessor(), output_format, output))
+            self.assert_matches_full_run(output_format, output)
+            for step in range(3):
+                for student in self.rng.sample(self.students, 5):
+                    student['room'] = self.rng.randrange(len(self.rooms))
+                self.rng.choice(self.rooms)['name'] += ' (renamed)'
+                if step == 1:
+                    self.rooms.pop(self.rng.randrange(len(self.rooms)))
+                self.save()
+                message = self.run_processor(IncrementalProcessor(), output_format, output)
+                self.assertLess(self.rerendered(message), len(self.rooms), message)
+                self.assert_matches_full_run(output_format, output)
+
+    def test_stale_or_tampered_checkpoint_gives_full_run(self):
+        output = os.path.join(self.directory, 'out.json')
+        checkpoint = output + CHECKPOINT_SUFFIX
+
+        def write(path: str, mode: str, data: bytes):
+            with open(path, mode) as f:
+                f.write(data)
+
+        tampering = [
+            lambda: write(output, 'ab', b' '),
+            lambda: write(checkpoint, 'wb', b'not json\n'),
+            lambda: os.remove(checkpoint),
+        ]
+        for tamper in tampering:
+            self.run_processor(IncrementalProcessor(), 'json', 'out.json')
+            tamper()
+            self.students[0]['room'] = (self.students[0]['room'] + 1) % self.ROOMS
+            self.save()
+            message = self.run_processor(IncrementalProcessor(), 'json', 'out.json')
+            self.assertEqual(self.rerendered(message), self.ROOMS, message)
+            self.assert_matches_full_run('json', 'out.json')
+        # A checkpoint written for other settings is stale too.
+        self.run_processor(IncrementalProcessor(), 'json', 'out.json')
+        message = self.run_processor(IncrementalProcessor(), 'ndjson', 'out.json')
+        self.assertEqual(self.rerendered(message), self.ROOMS, message)
+
+    def test_unchanged_inputs_still_honour_new_stats_settings(self):
+        stats_file = os.path.join(self.directory, 'stats.json')
+
+        def run(top_rooms: int, bin_width: int):
+            processor = IncrementalProcessor(stats_file=stats_file, top_rooms=top_rooms, bin_width=bin_width)
+            message = self.run_processor(processor, 'json', 'out.json')
+            with open(stats_file, encoding='utf-8') as f:
+                stats = json.load(f)
+            return message, stats
+
+        self.run_processor(IncrementalProcessor(), 'json', 'out.json')
+        message, stats = run(10, 5)
+        self.assertNotIn('is up to date', message)
+        self.assertEqual(len(stats['fullest_rooms']), 10)
+        message, stats = run(3, 100)
+        self.assertNotIn('is up to date', message)
+        self.assertEqual(self.rerendered(message), 0)
+        self.assertEqual((len(stats['fullest_rooms']), len(stats['histogram'])), (3, 1))
+        self.assertIn('is up to date', run(3, 100)[0])
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_parquet_gives_full_run(self):
+        import pyarrow.parquet as pq
+
+        output = os.path.join(self.directory, 'out.parquet')
+        with open(output + CHECKPOINT_SUFFIX, 'w') as f:
+            f.write('{}\n')
+        message = self.run_processor(IncrementalProcessor(), 'parquet', 'out.parquet')
+        self.assertIn('cannot be patched', message)
+        self.assertFalse(os.path.exists(output + CHECKPOINT_SUFFIX))
+        self.run_processor(RoomStudentProcessor(), 'parquet', 'full.parquet')
+        self.assertEqual(pq.read_table(output), pq.read_table(os.path.join(self.directory, 'full.parquet')))
+
+
+if __name__ == '__main__':
+    unittest.main()